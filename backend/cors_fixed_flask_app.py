@@ -4,56 +4,18 @@ CORS Fixed Flask App
 A Flask app with the most permissive CORS configuration for development
 """
 
+import io
 import os
 import json
 import logging
 import uuid # Import the uuid module
 from datetime import datetime
-from flask import Flask, request, jsonify, make_response, send_from_directory
+from flask import Flask, request, jsonify, make_response, send_file, send_from_directory
 from flask_cors import CORS
 from dotenv import load_dotenv
 
-# ReportLab imports for PDF generation
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Image, ListFlowable, Table, TableStyle
-from reportlab.platypus.tableofcontents import TableOfContents # Correct import for TableOfContents
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.lib import colors # Import colors
-from reportlab.pdfgen import canvas
-
-# ReportLab Graphics imports for charts
-from reportlab.graphics.shapes import Drawing, String
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-
 import re
 
-# Custom canvas for page numbers and footer
-class _QuizReportCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self.pages = []
-
-    def showPage(self):
-        self.pages.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self.pages)
-        for page_num, page in enumerate(self.pages):
-            self.__dict__.update(page)
-            self.draw_page_footer(page_num + 1, num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_page_footer(self, page_num, num_pages):
-        self.saveState()
-        self.setFont('Helvetica', 9)
-        self.setFillColor(colors.HexColor('#555555')) # Gray color for footer
-        self.drawString(inch, 0.75 * inch, f"Page {page_num} of {num_pages}")
-        self.restoreState()
-
 # Load environment variables
 load_dotenv()
 
@@ -88,7 +50,6 @@ except ImportError as e:
 try:
     from web_scraper import StudyMaterialScraper
     from ai_quiz_generator import AIQuizGenerator
-    from report_generator import ReportGenerator
     scraper = StudyMaterialScraper()
     quiz_generator = AIQuizGenerator()
     print("✅ Loaded web scraper and AI quiz generator")
@@ -133,6 +94,18 @@ except ImportError as e:
         }
     }
 
+# Enhanced study material generator, created on first use and shared across requests
+enhanced_generator = None
+
+def get_enhanced_generator():
+    """Return the shared EnhancedStudyMaterialGenerator, creating it on first use"""
+    global enhanced_generator
+    if enhanced_generator is None:
+        from enhanced_study_material_generator import EnhancedStudyMaterialGenerator
+        enhanced_generator = EnhancedStudyMaterialGenerator()
+        logger.info("✅ Enhanced Study Material Generator initialized")
+    return enhanced_generator
+
 def add_cors_headers(response):
     """Add CORS headers to any response"""
     response.headers['Access-Control-Allow-Origin'] = '*'
@@ -141,13 +114,16 @@ def add_cors_headers(response):
     response.headers['Access-Control-Allow-Credentials'] = 'false'
     return response
 
+# Precompiled patterns for URL slug generation
+SLUG_SPACES_RE = re.compile(r'\s+')
+SLUG_INVALID_RE = re.compile(r'[^a-z0-9-]')
+
 # Helper function to generate a URL-friendly slug
 def _generate_url_slug(text: str) -> str:
-    text = text.lower()
-    # Replace non-alphanumeric characters (except hyphens) with empty string
-    text = re.sub(r'[^a-z0-9-]', '', text)
-    # Replace spaces with hyphens
-    text = re.sub(r'\s+', '-', text)
+    # Replace spaces with hyphens first, so words stay separated
+    text = SLUG_SPACES_RE.sub('-', text.lower())
+    # Remove non-alphanumeric characters (except hyphens)
+    text = SLUG_INVALID_RE.sub('', text)
     return text.strip('-')
 
 @app.route('/health', methods=['GET'])
@@ -341,9 +317,7 @@ def generate_enhanced_study_material():
         
         # Initialize enhanced study material generator
         try:
-            from enhanced_study_material_generator import EnhancedStudyMaterialGenerator
-            enhanced_generator = EnhancedStudyMaterialGenerator()
-            logger.info("✅ Enhanced Study Material Generator initialized for API endpoint")
+            enhanced_generator = get_enhanced_generator()
         except ImportError as e:
             logger.error(f"❌ Failed to import Enhanced Study Material Generator: {e}")
             error_response = jsonify({"error": "Enhanced study material generator not available"}), 500
@@ -629,20 +603,35 @@ def generate_report():
             error_response = jsonify({"error": "Subject, unit, and evaluation result are required"}), 400
             return add_cors_headers(error_response[0]), error_response[1]
 
-        # Define the path for saving reports
-        reports_dir = os.path.join(os.getcwd(), 'backend', 'storage', 'reports')
-        os.makedirs(reports_dir, exist_ok=True)
+        # Imported on first use so ReportLab stays out of the app's startup path
+        from report_generator import ReportGenerator, report_filename
 
         # Generate the report using the ReportGenerator
         report_generator = ReportGenerator()
         logger.info(f"Generating report for subject: {subject}, unit: {unit}")
-        report_filename = report_generator.generate_report_pdf(subject, unit, evaluation_result, reports_dir)
-        logger.info(f"Generated report filename: {report_filename}")
+
+        # Inline requests get the PDF in this response instead of a saved file to fetch later
+        if data.get('inline'):
+            pdf_bytes = report_generator.build_report_pdf(subject, unit, evaluation_result)
+            response = send_file(
+                io.BytesIO(pdf_bytes),
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=report_filename(subject, unit)
+            )
+            return add_cors_headers(response)
+
+        # Define the path for saving reports
+        reports_dir = os.path.join(os.getcwd(), 'backend', 'storage', 'reports')
+        os.makedirs(reports_dir, exist_ok=True)
+
+        saved_filename = report_generator.generate_report_pdf(subject, unit, evaluation_result, reports_dir)
+        logger.info(f"Generated report filename: {saved_filename}")
 
         response = jsonify({
             "message": "Report generated successfully",
-            "filename": report_filename,
-            "report_url": f"/study/download_report/{report_filename}"
+            "filename": saved_filename,
+            "report_url": f"/study/download_report/{saved_filename}"
         })
         logger.info(f"Response being sent: {response.get_json()}")
         return add_cors_headers(response)
@@ -670,8 +659,7 @@ def download_youtube_video():
         
         # Initialize enhanced study material generator
         try:
-            from enhanced_study_material_generator import EnhancedStudyMaterialGenerator
-            enhanced_generator = EnhancedStudyMaterialGenerator()
+            enhanced_generator = get_enhanced_generator()
         except ImportError as e:
             logger.error(f"❌ Failed to import Enhanced Study Material Generator: {e}")
             error_response = jsonify({"error": "Enhanced study material generator not available"}), 500
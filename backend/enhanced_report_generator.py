@@ -55,6 +55,9 @@ class EnhancedReportGenerator:
             'code': 'Courier'
         }
         
+        # Styles only depend on the palette above, so build them once per generator
+        self.styles = self._create_styles()
+        
     def generate_charts(self, evaluation_result: dict) -> Dict[str, str]:
         """
         Generate charts and save as base64 encoded images
@@ -1067,8 +1070,7 @@ class EnhancedReportGenerator:
             # Generate charts
             charts = self.generate_charts(evaluation_result)
             
-            # Create styles
-            styles = self._create_styles()
+            styles = self.styles
             
             # Build story
             story = []
@@ -18,6 +18,12 @@ from bs4 import BeautifulSoup
 import yt_dlp
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# HTML parser shared by the scrapers (lxml when installed)
+try:
+    from scraper_utils import HTML_PARSER
+except ImportError:
+    from backend.scraper_utils import HTML_PARSER
+
 # Import existing AI configuration
 try:
     from ai_config import AIConfig
@@ -281,7 +287,7 @@ class EnhancedStudyMaterialGenerator:
             
             response = self.session.get(search_url, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(response.content, HTML_PARSER)
                 
                 results = []
                 # Look for search result links
@@ -324,7 +330,7 @@ class EnhancedStudyMaterialGenerator:
         try:
             response = self.session.get(url, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(response.content, HTML_PARSER)
                 
                 # Extract title
                 title = None
@@ -378,7 +384,7 @@ class EnhancedStudyMaterialGenerator:
         try:
             response = self.session.get(url, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(response.content, HTML_PARSER)
                 
                 # Extract title
                 title = None
@@ -3,6 +3,7 @@ import json
 import subprocess
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
@@ -385,29 +386,31 @@ def get_study_subjects():
         logger.error(f"Error getting study subjects: {e}")
         return jsonify({"error": str(e)}), 500
 
+@lru_cache(maxsize=16)
+def subject_units_body(subject_code: str) -> str:
+    """Serialized units response for a known subject code"""
+    # DIPLOMA_SUBJECTS is static, so each subject's body only needs building once
+    subject_data = DIPLOMA_SUBJECTS[subject_code]
+    units = [
+        {"name": unit_name, "topics": topics, "topic_count": len(topics)}
+        for unit_name, topics in subject_data["units"].items()
+    ]
+    return app.json.dumps({
+        "subject_code": subject_code,
+        "subject_name": subject_data["name"],
+        "units": units,
+        "total_units": len(units)
+    })
+
 @app.route('/study/subjects/<subject_code>/units', methods=['GET'])
 def get_subject_units(subject_code):
     """Get units for a specific subject"""
     try:
+        # Checked before the cache so unknown codes cannot fill it
         if subject_code not in DIPLOMA_SUBJECTS:
             return jsonify({"error": "Subject not found"}), 404
         
-        subject_data = DIPLOMA_SUBJECTS[subject_code]
-        units = []
-        
-        for unit_name, topics in subject_data["units"].items():
-            units.append({
-                "name": unit_name,
-                "topics": topics,
-                "topic_count": len(topics)
-            })
-        
-        return jsonify({
-            "subject_code": subject_code,
-            "subject_name": subject_data["name"],
-            "units": units,
-            "total_units": len(units)
-        })
+        return app.response_class(subject_units_body(subject_code), mimetype='application/json')
     except Exception as e:
         logger.error(f"Error getting subject units: {e}")
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,20 @@
+"""
+Health Check Utilities
+Shared helpers for the /health endpoints of the simple FastAPI and Flask apps
+"""
+
+import time
+from datetime import datetime
+
+# /health only needs second precision, so the formatted time is reused within a second
+health_timestamp_cache = (0, "")
+
+def health_timestamp() -> str:
+    """Current local time in ISO format, formatted at most once per second"""
+    global health_timestamp_cache
+    second = int(time.time())
+    cached_second, timestamp = health_timestamp_cache
+    if second != cached_second:
+        timestamp = datetime.fromtimestamp(second).isoformat()
+        health_timestamp_cache = (second, timestamp)
+    return timestamp
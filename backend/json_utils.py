@@ -0,0 +1,12 @@
+"""
+JSON Utilities
+Optional orjson support shared by the backend apps
+"""
+
+# orjson encodes and decodes JSON several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
@@ -1,23 +1,35 @@
 import os
 import json
 import subprocess
+import shutil
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 import io
 import tempfile
 import asyncio
+import threading
 import urllib.parse
+import zipfile
 from pathlib import Path
 import re
 import sqlite3
 import hashlib
+import gzip
+import itertools
+import multiprocessing
+import time
+from string import Template
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # Import export libraries
 try:
@@ -53,6 +65,32 @@ except ImportError:
     SYLLABUS_PARSING_AVAILABLE = False
     print("Warning: Syllabus parsing libraries not available. Install PyPDF2 and python-docx for syllabus functionality.")
 
+# PyMuPDF extracts PDF text much faster than PyPDF2, so prefer it when installed
+try:
+    import fitz
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    from json_utils import ORJSON_AVAILABLE, orjson
+except ImportError:
+    from backend.json_utils import ORJSON_AVAILABLE, orjson
+
+# Aho-Corasick matcher for finding syllabus topics in watched video URLs
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Fast non-cryptographic hashing for storage dedup keys
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -60,6 +98,41 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def loads_json(data):
+    """Parse JSON with orjson when available, falling back to the stdlib"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_json(data) -> bytes:
+    """Serialize JSON to compact UTF-8 bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def extract_json_array(text: str) -> Optional[str]:
+    """Return the slice from the first '[' to the last ']' in text, if any"""
+    start = text.find('[')
+    end = text.rfind(']')
+    if start != -1 and end > start:
+        return text[start:end + 1]
+    return None
+
+# Precompiled regular expressions
+# Syllabus lines: unit header (Unit 1, Chapter 1, ...), numbered topic (1. Topic,
+# 1) Topic) or bullet (- Topic), tried in that order in a single match
+SYLLABUS_LINE_RE = re.compile(
+    r'^(?:(?P<unit_kind>Unit|Chapter|Module|Section)\s*(?P<unit_number>\d+)[:.\s]*(?P<unit_title>.*)'
+    r'|\d+[.)]\s*(?P<numbered>.+)'
+    r'|[-•*]\s*(?P<bullet>.+))',
+    re.IGNORECASE
+)
+DURATION_HOURS_RE = re.compile(r'(\d+)H')
+DURATION_MINUTES_RE = re.compile(r'(\d+)M')
+DURATION_SECONDS_RE = re.compile(r'(\d+)S')
+# Characters stripped from names used in storage filenames
+SAFE_NAME_RE = re.compile(r'[^\w\s-]')
+
 # Import study routes with robust import handling
 STUDY_ROUTES_AVAILABLE = False
 study_router = None
@@ -86,7 +159,18 @@ except ImportError:
             print(f"⚠️  Study routes not available: {e}")
             print("   The study module will not be available.")
 
-app = FastAPI(title="YouTube Video Search API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the API clients before the app starts serving requests"""
+    warm_up_ai_clients()
+    yield
+
+app = FastAPI(
+    title="YouTube Video Search API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+)
 
 # Add CORS middleware
 try:
@@ -120,6 +204,15 @@ else:
 # Global variables for AI models
 whisper_model = None
 summarizer = None
+gemini_models = {}
+openai_client = None
+# The loaders below run in worker threads, so each lazy init is guarded by a lock
+whisper_model_lock = threading.Lock()
+summarizer_lock = threading.Lock()
+gemini_models_lock = threading.Lock()
+openai_client_lock = threading.Lock()
+# googleapiclient services are not thread-safe, so keep one per worker thread
+youtube_services = threading.local()
 
 # Core Pydantic models
 class Comment(BaseModel):
@@ -282,50 +375,103 @@ def get_whisper_model():
     """Lazy load Whisper model"""
     global whisper_model
     if whisper_model is None and AI_AVAILABLE:
-        try:
-            # Get model size from environment variable, default to 'base'
-            model_size = os.getenv("WHISPER_MODEL_SIZE", "base")
-            logger.info(f"Loading Whisper model ({model_size})...")
-            whisper_model = whisper.load_model(model_size)
-            logger.info("Whisper model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load Whisper model: {e}")
-            raise HTTPException(status_code=500, detail="Failed to load Whisper model")
+        with whisper_model_lock:
+            if whisper_model is None:
+                try:
+                    # Get model size from environment variable, default to 'base'
+                    model_size = os.getenv("WHISPER_MODEL_SIZE", "base")
+                    logger.info(f"Loading Whisper model ({model_size})...")
+                    whisper_model = whisper.load_model(model_size)
+                    logger.info("Whisper model loaded successfully")
+                except Exception as e:
+                    logger.error(f"Failed to load Whisper model: {e}")
+                    raise HTTPException(status_code=500, detail="Failed to load Whisper model")
     return whisper_model
 
 def get_summarizer():
     """Lazy load summarization model"""
     global summarizer
     if summarizer is None and AI_AVAILABLE:
-        try:
-            # Get model from environment variable, default to 't5-small'
-            model_name = os.getenv("SUMMARIZATION_MODEL", "t5-small")
-            logger.info(f"Loading summarization model ({model_name})...")
-            
-            # Try Gemini first as primary
-            if model_name.lower() in ["gemini", "openai"]:
-                gemini_api_key = os.getenv("GEMINI_API_KEY")
-                if gemini_api_key:
-                    logger.info("Using Gemini API as primary summarization model")
-                    return "gemini"
+        with summarizer_lock:
+            if summarizer is not None:
+                return summarizer
+            try:
+                # Get model from environment variable, default to 't5-small'
+                model_name = os.getenv("SUMMARIZATION_MODEL", "t5-small")
+                logger.info(f"Loading summarization model ({model_name})...")
                 
-                # Try OpenAI as fallback
-                openai_api_key = os.getenv("OPENAI_API_KEY")
-                if openai_api_key:
-                    logger.info("Using OpenAI API as fallback")
-                    return "openai"
+                # Try Gemini first as primary
+                if model_name.lower() in ["gemini", "openai"]:
+                    gemini_api_key = os.getenv("GEMINI_API_KEY")
+                    if gemini_api_key:
+                        logger.info("Using Gemini API as primary summarization model")
+                        return "gemini"
+                    
+                    # Try OpenAI as fallback
+                    openai_api_key = os.getenv("OPENAI_API_KEY")
+                    if openai_api_key:
+                        logger.info("Using OpenAI API as fallback")
+                        return "openai"
+                    
+                    # If neither API key is available
+                    logger.warning("Both Gemini and OpenAI API keys not found, falling back to t5-small")
+                    model_name = "t5-small"
                 
-                # If neither API key is available
-                logger.warning("Both Gemini and OpenAI API keys not found, falling back to t5-small")
-                model_name = "t5-small"
-            
-            summarizer = pipeline("summarization", model=model_name, device=-1)
-            logger.info("Summarization model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load summarization model: {e}")
-            raise HTTPException(status_code=500, detail="Failed to load summarization model")
+                summarizer = pipeline("summarization", model=model_name, device=-1)
+                logger.info("Summarization model loaded successfully")
+            except Exception as e:
+                logger.error(f"Failed to load summarization model: {e}")
+                raise HTTPException(status_code=500, detail="Failed to load summarization model")
     return summarizer
 
+def get_gemini_model(model_name: str = "gemini-pro"):
+    """Return a cached Gemini model, configuring the SDK once on first use"""
+    model = gemini_models.get(model_name)
+    if model is None:
+        with gemini_models_lock:
+            model = gemini_models.get(model_name)
+            if model is None:
+                gemini_api_key = os.getenv("GEMINI_API_KEY")
+                if not gemini_api_key:
+                    raise Exception("Gemini API key not found")
+                if not gemini_models:
+                    genai.configure(api_key=gemini_api_key)
+                model = genai.GenerativeModel(model_name)
+                gemini_models[model_name] = model
+                logger.info(f"Gemini model {model_name} initialized")
+    return model
+
+def get_openai_client():
+    """Return a cached OpenAI client"""
+    global openai_client
+    if openai_client is None:
+        with openai_client_lock:
+            if openai_client is None:
+                openai_api_key = os.getenv("OPENAI_API_KEY")
+                if not openai_api_key:
+                    raise Exception("OpenAI API key not found")
+                openai_client = openai.OpenAI(api_key=openai_api_key)
+                logger.info("OpenAI client initialized")
+    return openai_client
+
+def warm_up_ai_clients():
+    """Create the API clients once at startup instead of on every request"""
+    if not AI_AVAILABLE:
+        return
+    
+    for name, factory in (("Gemini", get_gemini_model), ("OpenAI", get_openai_client)):
+        try:
+            factory()
+        except Exception as e:
+            logger.info(f"{name} client not initialized at startup: {e}")
+    
+    # Whisper takes a while to load, so only preload it when asked to
+    if os.getenv("PRELOAD_WHISPER_MODEL", "false").lower() == "true":
+        try:
+            get_whisper_model()
+        except HTTPException as e:
+            logger.warning(f"Whisper model not preloaded: {e.detail}")
+
 def generate_filename(prefix: str, extension: str, keyword: str = "") -> str:
     """Generate filename with timestamp"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -609,12 +755,7 @@ def download_audio(video_url: str, output_dir: str) -> tuple[str, str, float]:
 def transcribe_with_gemini(audio_file: str) -> str:
     """Transcribe audio using Gemini API (experimental)"""
     try:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_api_key:
-            raise Exception("Gemini API key not found")
-        
-        # Configure Gemini
-        genai.configure(api_key=gemini_api_key)
+        get_gemini_model()
         
         # Note: Gemini doesn't directly support audio transcription yet
         # This is a placeholder for future functionality
@@ -780,13 +921,7 @@ def summarize_text(text: str) -> str:
 def generate_flashcards_with_gemini(text: str, video_title: str) -> List[Flashcard]:
     """Generate flashcards using Gemini API"""
     try:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_api_key:
-            raise Exception("Gemini API key not found")
-        
-        # Configure Gemini
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-pro')
+        model = get_gemini_model('gemini-pro')
         
         # Create a comprehensive prompt for flashcard generation
         prompt = f"""
@@ -816,15 +951,11 @@ Transcription:
         response_text = response.text.strip()
         
         # Try to extract JSON from the response
-        import json
-        import re
-        
         # Look for JSON array in the response
-        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
+        json_str = extract_json_array(response_text)
+        if json_str:
             try:
-                flashcards_data = json.loads(json_str)
+                flashcards_data = loads_json(json_str)
                 flashcards = []
                 for card_data in flashcards_data:
                     if isinstance(card_data, dict) and 'question' in card_data and 'answer' in card_data:
@@ -874,16 +1005,16 @@ def generate_fallback_flashcards(text: str, video_title: str) -> List[Flashcard]
     
     return flashcards
 
+# Prompt pieces shared by every summarization call
+SUMMARY_PROMPT = "Please summarize the following text in 2-3 sentences:\n\n"
+CONCISE_SUMMARY_PROMPT = "Please provide a concise summary of the following text:\n\n"
+SUMMARY_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant that summarizes text concisely and accurately."}
+QUIZ_SYSTEM_MESSAGE = {"role": "system", "content": "You are a helpful assistant that creates educational quiz questions."}
+
 def summarize_with_gemini(text: str) -> str:
     """Summarize text using Google Gemini API"""
     try:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_api_key:
-            raise Exception("Gemini API key not found")
-        
-        # Configure Gemini
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-pro')
+        model = get_gemini_model('gemini-pro')
         
         # For very long text, chunk it first
         if len(text) > 4000:
@@ -893,8 +1024,7 @@ def summarize_with_gemini(text: str) -> str:
             for chunk in chunks:
                 if len(chunk.strip()) > 100:
                     try:
-                        prompt = f"Please summarize the following text in 2-3 sentences:\n\n{chunk}"
-                        response = model.generate_content(prompt)
+                        response = model.generate_content(SUMMARY_PROMPT + chunk)
                         summaries.append(response.text.strip())
                     except Exception as e:
                         logger.warning(f"Failed to summarize chunk with Gemini: {e}")
@@ -904,15 +1034,13 @@ def summarize_with_gemini(text: str) -> str:
             
             # If still too long, summarize the combined summary
             if len(combined_summary) > 1000:
-                prompt = f"Please provide a concise summary of the following text:\n\n{combined_summary}"
-                response = model.generate_content(prompt)
+                response = model.generate_content(CONCISE_SUMMARY_PROMPT + combined_summary)
                 return response.text.strip()
             
             return combined_summary
         else:
             # Direct summarization for shorter text
-            prompt = f"Please summarize the following text in 2-3 sentences:\n\n{text}"
-            response = model.generate_content(prompt)
+            response = model.generate_content(SUMMARY_PROMPT + text)
             return response.text.strip()
             
     except Exception as e:
@@ -926,12 +1054,7 @@ def summarize_with_gemini(text: str) -> str:
 def summarize_with_openai(text: str) -> str:
     """Summarize text using OpenAI API"""
     try:
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise Exception("OpenAI API key not found")
-        
-        # Initialize OpenAI client
-        client = openai.OpenAI(api_key=openai_api_key)
+        client = get_openai_client()
         
         # For very long text, chunk it first
         if len(text) > 4000:
@@ -944,8 +1067,8 @@ def summarize_with_openai(text: str) -> str:
                         response = client.chat.completions.create(
                             model="gpt-3.5-turbo",
                             messages=[
-                                {"role": "system", "content": "You are a helpful assistant that summarizes text concisely and accurately."},
-                                {"role": "user", "content": f"Please summarize the following text in 2-3 sentences:\n\n{chunk}"}
+                                SUMMARY_SYSTEM_MESSAGE,
+                                {"role": "user", "content": SUMMARY_PROMPT + chunk}
                             ],
                             max_tokens=150,
                             temperature=0.3
@@ -962,8 +1085,8 @@ def summarize_with_openai(text: str) -> str:
                 response = client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[
-                        {"role": "system", "content": "You are a helpful assistant that summarizes text concisely and accurately."},
-                        {"role": "user", "content": f"Please provide a concise summary of the following text:\n\n{combined_summary}"}
+                        SUMMARY_SYSTEM_MESSAGE,
+                        {"role": "user", "content": CONCISE_SUMMARY_PROMPT + combined_summary}
                     ],
                     max_tokens=200,
                     temperature=0.3
@@ -976,8 +1099,8 @@ def summarize_with_openai(text: str) -> str:
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": "You are a helpful assistant that summarizes text concisely and accurately."},
-                    {"role": "user", "content": f"Please summarize the following text in 2-3 sentences:\n\n{text}"}
+                    SUMMARY_SYSTEM_MESSAGE,
+                    {"role": "user", "content": SUMMARY_PROMPT + text}
                 ],
                 max_tokens=200,
                 temperature=0.3
@@ -1043,15 +1166,13 @@ def create_transcript_pdf(transcription: str, summary: str, video_title: str, vi
 
 def parse_duration(duration_str: str) -> float:
     """Parse YouTube duration from ISO 8601 format (PT1H2M3S) to seconds"""
-    import re
-    
     # Remove PT prefix
     duration_str = duration_str.replace('PT', '')
     
     # Extract hours, minutes, seconds using regex
-    hours = re.search(r'(\d+)H', duration_str)
-    minutes = re.search(r'(\d+)M', duration_str)
-    seconds = re.search(r'(\d+)S', duration_str)
+    hours = DURATION_HOURS_RE.search(duration_str)
+    minutes = DURATION_MINUTES_RE.search(duration_str)
+    seconds = DURATION_SECONDS_RE.search(duration_str)
     
     total_seconds = 0
     if hours:
@@ -1064,13 +1185,18 @@ def parse_duration(duration_str: str) -> float:
     return float(total_seconds)
 
 def get_youtube_api_service():
-    """Initialize YouTube API service"""
+    """Initialize YouTube API service (built once per thread and reused)"""
+    service = getattr(youtube_services, "service", None)
+    if service is not None:
+        return service
+    
     api_key = os.getenv("YOUTUBE_API_KEY")
     if not api_key:
         raise HTTPException(status_code=500, detail="YouTube API key not configured")
     
     try:
-        return build("youtube", "v3", developerKey=api_key)
+        youtube_services.service = build("youtube", "v3", developerKey=api_key)
+        return youtube_services.service
     except Exception as e:
         logger.error(f"Failed to initialize YouTube API: {e}")
         raise HTTPException(status_code=500, detail="Failed to initialize YouTube API")
@@ -1177,7 +1303,7 @@ def search_videos_with_ytdlp(keyword: str) -> List[Video]:
         for line in result.stdout.strip().split('\n'):
             if line.strip():
                 try:
-                    videos_data.append(json.loads(line))
+                    videos_data.append(loads_json(line))
                 except json.JSONDecodeError:
                     continue
         
@@ -1224,13 +1350,13 @@ async def get_videos(request: VideoRequest):
         
         # Try YouTube API first
         try:
-            videos = search_videos_with_api(request.keyword)
+            videos = await asyncio.to_thread(search_videos_with_api, request.keyword)
             logger.info(f"Successfully fetched {len(videos)} videos using YouTube API")
         except HTTPException as api_error:
             logger.warning(f"YouTube API failed, trying yt-dlp: {api_error}")
             # Fallback to yt-dlp
             try:
-                videos = search_videos_with_ytdlp(request.keyword)
+                videos = await asyncio.to_thread(search_videos_with_ytdlp, request.keyword)
                 source = "yt-dlp"
                 logger.info(f"Successfully fetched {len(videos)} videos using yt-dlp")
             except HTTPException as ytdlp_error:
@@ -1294,6 +1420,40 @@ async def export_to_pdf(request: ExportRequest):
         logger.error(f"Error exporting to PDF: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to export to PDF: {str(e)}")
 
+@app.post("/export/all")
+async def export_all(request: ExportRequest):
+    """Export videos to Excel and PDF in a single zip archive"""
+    try:
+        if not request.videos:
+            raise HTTPException(status_code=400, detail="No videos to export")
+        
+        # Use provided keyword or default
+        keyword = request.keyword or "youtube_results"
+        
+        # Both documents are independent, so build them side by side
+        excel_data, pdf_data = await asyncio.gather(
+            asyncio.to_thread(create_excel_file, request.videos, keyword),
+            asyncio.to_thread(create_pdf_file, request.videos, keyword)
+        )
+        
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(generate_filename("yt_results", "xlsx", keyword), excel_data)
+            archive.writestr(generate_filename("yt_results", "pdf", keyword), pdf_data)
+        filename = generate_filename("yt_results", "zip", keyword)
+        
+        return Response(
+            content=output.getvalue(),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting videos: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to export videos: {str(e)}")
+
 @app.post("/transcribe/{video_url:path}", response_model=TranscribeResponse)
 async def transcribe_video(video_url: str):
     """Transcribe a YouTube video"""
@@ -1315,11 +1475,11 @@ async def transcribe_video(video_url: str):
             try:
                 # Download audio
                 logger.info("Downloading audio...")
-                audio_file, video_title, duration = download_audio(video_url, temp_dir)
+                audio_file, video_title, duration = await asyncio.to_thread(download_audio, video_url, temp_dir)
                 
                 # Transcribe audio
                 logger.info("Transcribing audio...")
-                transcription = transcribe_audio(audio_file)
+                transcription = await asyncio.to_thread(transcribe_audio, audio_file)
                 
                 # Clean up temporary files
                 try:
@@ -1393,7 +1553,7 @@ async def summarize_transcription(request: SummarizeRequest):
         logger.info("Starting text summarization...")
         
         # Summarize the transcription
-        summary = summarize_text(request.transcription)
+        summary = await asyncio.to_thread(summarize_text, request.transcription)
         
         logger.info("Summarization completed")
         
@@ -1409,6 +1569,61 @@ async def summarize_transcription(request: SummarizeRequest):
         logger.error(f"Error summarizing transcription: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to summarize transcription: {str(e)}")
 
+def sse_event(data: dict) -> str:
+    """Format a payload as a server-sent event"""
+    return f"data: {dumps_json(data).decode('utf-8')}\n\n"
+
+# Upper bound on concurrent chunk summaries, to cap parallel Gemini/OpenAI calls
+# and threads sharing the local summarization pipeline
+SUMMARY_CHUNK_CONCURRENCY = 4
+
+@app.post("/stream/summarize_transcription")
+async def stream_summarize_transcription(request: SummarizeRequest):
+    """Summarize a transcription, streaming each chunk summary as it completes"""
+    if not AI_AVAILABLE:
+        raise HTTPException(status_code=500, detail="AI libraries not available. Install transformers.")
+    
+    text = request.transcription
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Transcription text is empty")
+    
+    async def event_stream():
+        try:
+            if len(text) <= 4000:
+                summary = await asyncio.to_thread(summarize_text, text)
+            else:
+                # Summarize chunks concurrently and report each one as soon as it is ready
+                chunks = [chunk for chunk in chunk_text(text, 3000) if len(chunk.strip()) > 100]
+                semaphore = asyncio.Semaphore(SUMMARY_CHUNK_CONCURRENCY)
+                
+                async def summarize_chunk(chunk_id: int, chunk: str):
+                    async with semaphore:
+                        return chunk_id, await asyncio.to_thread(summarize_text, chunk)
+                
+                summaries = [""] * len(chunks)
+                tasks = [summarize_chunk(i, chunk) for i, chunk in enumerate(chunks)]
+                for next_done in asyncio.as_completed(tasks):
+                    chunk_id, chunk_summary = await next_done
+                    summaries[chunk_id] = chunk_summary
+                    yield sse_event({"type": "partial", "chunk_id": chunk_id, "summary": chunk_summary})
+                
+                summary = " ".join(summaries)
+                if len(summary) > 1000:
+                    summary = await asyncio.to_thread(summarize_text, summary)
+            
+            yield sse_event({
+                "type": "final",
+                "summary": summary,
+                "original_length": len(text),
+                "summary_length": len(summary)
+            })
+        except Exception as e:
+            logger.error(f"Error streaming summary: {e}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield sse_event({"type": "error", "detail": f"Failed to summarize transcription: {detail}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/learning_mode/{video_url:path}", response_model=LearningModeResponse)
 async def learning_mode(video_url: str):
     """Generate learning flashcards for a YouTube video"""
@@ -1436,11 +1651,11 @@ async def learning_mode(video_url: str):
             try:
                 # Download audio and get transcription
                 logger.info("Downloading audio for learning mode...")
-                audio_file, video_title, duration = download_audio(video_url, temp_dir)
+                audio_file, video_title, duration = await asyncio.to_thread(download_audio, video_url, temp_dir)
                 
                 # Transcribe audio
                 logger.info("Transcribing audio for learning mode...")
-                transcription = transcribe_audio(audio_file)
+                transcription = await asyncio.to_thread(transcribe_audio, audio_file)
                 
                 # Check if transcription is long enough for meaningful flashcards
                 if len(transcription.strip()) < 100:
@@ -1451,7 +1666,7 @@ async def learning_mode(video_url: str):
                 
                 # Generate flashcards
                 logger.info("Generating flashcards...")
-                flashcards = generate_flashcards_with_gemini(transcription, video_title)
+                flashcards = await asyncio.to_thread(generate_flashcards_with_gemini, transcription, video_title)
                 
                 if not flashcards:
                     raise HTTPException(
@@ -1508,6 +1723,54 @@ async def learning_mode(video_url: str):
         logger.error(f"Error in learning mode: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate learning mode: {str(e)}")
 
+@app.post("/stream/learning_mode/{video_url:path}")
+async def stream_learning_mode(video_url: str):
+    """Generate learning flashcards, streaming progress and each card as it becomes available"""
+    if not AI_AVAILABLE:
+        raise HTTPException(status_code=500, detail="AI libraries not available for learning mode.")
+    
+    video_url = urllib.parse.unquote(video_url)
+    if not ("youtube.com" in video_url or "youtu.be" in video_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL. Please provide a valid YouTube link.")
+    
+    try:
+        video_id = extract_video_id(video_url)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Could not extract video ID from URL. Please check the YouTube URL format.")
+    
+    async def event_stream():
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                yield sse_event({"type": "status", "stage": "downloading"})
+                audio_file, video_title, duration = await asyncio.to_thread(download_audio, video_url, temp_dir)
+                
+                yield sse_event({"type": "status", "stage": "transcribing", "video_title": video_title})
+                transcription = await asyncio.to_thread(transcribe_audio, audio_file)
+                if len(transcription.strip()) < 100:
+                    yield sse_event({
+                        "type": "error",
+                        "detail": "Transcription is too short to generate meaningful flashcards. The video might be too brief or mostly silent."
+                    })
+                    return
+                
+                yield sse_event({"type": "status", "stage": "generating"})
+                flashcards = await asyncio.to_thread(generate_flashcards_with_gemini, transcription, video_title)
+                for flashcard in flashcards:
+                    yield sse_event({"type": "flashcard", "flashcard": flashcard.model_dump()})
+                
+                yield sse_event({
+                    "type": "final",
+                    "video_id": video_id,
+                    "video_title": video_title,
+                    "total_cards": len(flashcards)
+                })
+        except Exception as e:
+            logger.error(f"Error streaming learning mode: {e}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield sse_event({"type": "error", "detail": f"Learning mode failed: {detail}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/export/transcript")
 async def export_transcript(
     transcription: str,
@@ -1530,17 +1793,19 @@ async def export_transcript(
             )
         
         elif format.lower() == "txt":
-            # Create TXT content
-            txt_content = f"Video Transcription Report\n"
-            txt_content += f"{'=' * 50}\n\n"
-            txt_content += f"Video Title: {video_title}\n"
-            txt_content += f"Video URL: {video_url}\n\n"
-            txt_content += f"SUMMARY\n"
-            txt_content += f"{'-' * 20}\n"
-            txt_content += f"{summary}\n\n"
-            txt_content += f"FULL TRANSCRIPTION\n"
-            txt_content += f"{'-' * 20}\n"
-            txt_content += f"{transcription}\n"
+            # Create TXT content in one pass; repeated += would recopy the long summary each step
+            txt_content = "".join([
+                "Video Transcription Report\n",
+                "=" * 50, "\n\n",
+                f"Video Title: {video_title}\n",
+                f"Video URL: {video_url}\n\n",
+                "SUMMARY\n",
+                "-" * 20, "\n",
+                summary, "\n\n",
+                "FULL TRANSCRIPTION\n",
+                "-" * 20, "\n",
+                transcription, "\n",
+            ])
             
             filename = generate_filename("transcript", "txt", video_title)
             
@@ -1572,35 +1837,36 @@ async def health_check():
         "export_features": export_status
     }
 
+# Local ffmpeg locations to try when ffmpeg is not on the PATH
+FFMPEG_SEARCH_PATHS = (
+    Path(__file__).resolve().parent.parent / "ffmpeg" / "ffmpeg-master-latest-win64-gpl" / "bin",
+    Path.cwd() / "ffmpeg" / "ffmpeg-master-latest-win64-gpl" / "bin",
+    Path("C:\\Program Files\\ffmpeg\\bin"),
+    Path("C:\\ffmpeg\\bin")
+)
+
 # Add ffmpeg to PATH if it's not found
 def ensure_ffmpeg_available():
     """Ensure ffmpeg is available in the PATH"""
-    try:
-        subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True, timeout=5)
+    if shutil.which("ffmpeg"):
         logger.info("ffmpeg is available in PATH")
-    except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-        logger.warning("ffmpeg not found in PATH, trying to add local ffmpeg...")
-        
-        # Try to find local ffmpeg
-        possible_paths = [
-            os.path.join(os.path.dirname(__file__), "..", "ffmpeg", "ffmpeg-master-latest-win64-gpl", "bin"),
-            os.path.join(os.getcwd(), "ffmpeg", "ffmpeg-master-latest-win64-gpl", "bin"),
-            "C:\\Program Files\\ffmpeg\\bin",
-            "C:\\ffmpeg\\bin"
-        ]
-        
-        for path in possible_paths:
-            ffmpeg_exe = os.path.join(path, "ffmpeg.exe")
-            if os.path.exists(ffmpeg_exe):
-                logger.info(f"Found ffmpeg at: {path}")
-                # Add to PATH
-                current_path = os.environ.get("PATH", "")
-                if path not in current_path:
-                    os.environ["PATH"] = f"{path};{current_path}"
-                    logger.info("Added ffmpeg to PATH")
-                return
-        
-        logger.error("Could not find ffmpeg. Transcription may fail.")
+        return
+    
+    logger.warning("ffmpeg not found in PATH, trying to add local ffmpeg...")
+    
+    # Try to find local ffmpeg
+    for path in FFMPEG_SEARCH_PATHS:
+        if (path / "ffmpeg.exe").is_file():
+            path = str(path)
+            logger.info(f"Found ffmpeg at: {path}")
+            # Add to PATH
+            current_path = os.environ.get("PATH", "")
+            if path not in set(current_path.split(os.pathsep)):
+                os.environ["PATH"] = f"{path}{os.pathsep}{current_path}"
+                logger.info("Added ffmpeg to PATH")
+            return
+    
+    logger.error("Could not find ffmpeg. Transcription may fail.")
 
 # Call this during initialization
 ensure_ffmpeg_available()
@@ -1608,8 +1874,14 @@ ensure_ffmpeg_available()
 # Syllabus parsing functions
 def parse_text_syllabus(text: str) -> List[SyllabusTopic]:
     """Parse syllabus from plain text"""
-    topics = []
-    lines = text.strip().split('\n')
+    return parse_syllabus_lines(text.strip().split('\n'))
+
+def parse_syllabus_lines(lines: Iterable[str]) -> List[SyllabusTopic]:
+    """Parse syllabus topics from an iterable of lines"""
+    return list(iter_syllabus_topics(lines))
+
+def iter_syllabus_topics(lines: Iterable[str]) -> Iterator[SyllabusTopic]:
+    """Yield syllabus topics one at a time as the lines are scanned"""
     current_unit = "Unit 1"
     
     for line in lines:
@@ -1617,46 +1889,41 @@ def parse_text_syllabus(text: str) -> List[SyllabusTopic]:
         if not line:
             continue
             
-        # Check for unit headers (Unit 1, Chapter 1, etc.)
-        unit_match = re.match(r'^(Unit|Chapter|Module|Section)\s*(\d+)[:.\s]*(.*)', line, re.IGNORECASE)
-        if unit_match:
-            current_unit = f"{unit_match.group(1)} {unit_match.group(2)}"
-            topic = unit_match.group(3).strip()
+        match = SYLLABUS_LINE_RE.match(line)
+        if match is None:
+            # Assume it's a topic if it's not empty and doesn't match other patterns
+            if len(line) > 3 and not line.startswith('#'):
+                yield SyllabusTopic(unit=current_unit, topic=line)
+        elif match.group('unit_kind'):
+            # Unit headers start a new unit and may carry a topic
+            current_unit = f"{match.group('unit_kind')} {match.group('unit_number')}"
+            topic = match.group('unit_title').strip()
             if topic:
-                topics.append(SyllabusTopic(unit=current_unit, topic=topic))
+                yield SyllabusTopic(unit=current_unit, topic=topic)
         else:
-            # Check for numbered topics (1. Topic, 1) Topic, etc.)
-            topic_match = re.match(r'^\d+[.)]\s*(.+)', line)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                topics.append(SyllabusTopic(unit=current_unit, topic=topic))
-            else:
-                # Check for bullet points or dashes
-                bullet_match = re.match(r'^[-•*]\s*(.+)', line)
-                if bullet_match:
-                    topic = bullet_match.group(1).strip()
-                    topics.append(SyllabusTopic(unit=current_unit, topic=topic))
-                else:
-                    # Assume it's a topic if it's not empty and doesn't match other patterns
-                    if len(line) > 3 and not line.startswith('#'):
-                        topics.append(SyllabusTopic(unit=current_unit, topic=line))
+            # Numbered topics or bullet points
+            topic = (match.group('numbered') or match.group('bullet')).strip()
+            yield SyllabusTopic(unit=current_unit, topic=topic)
+
+def iter_pdf_lines(file_content: bytes) -> Iterator[str]:
+    """Yield the text lines of a PDF one page at a time"""
+    if PYMUPDF_AVAILABLE:
+        with fitz.open(stream=file_content, filetype="pdf") as pdf_doc:
+            for page in pdf_doc:
+                yield from page.get_text("text").splitlines()
+        return
     
-    return topics
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    for page in pdf_reader.pages:
+        yield from page.extract_text().splitlines()
 
 def parse_pdf_syllabus(file_content: bytes) -> List[SyllabusTopic]:
     """Parse syllabus from PDF file"""
-    if not SYLLABUS_PARSING_AVAILABLE:
-        raise HTTPException(status_code=500, detail="PDF parsing not available. Install PyPDF2.")
+    if not PYMUPDF_AVAILABLE and not SYLLABUS_PARSING_AVAILABLE:
+        raise HTTPException(status_code=500, detail="PDF parsing not available. Install pymupdf or PyPDF2.")
     
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return parse_text_syllabus(text)
+        return parse_syllabus_lines(iter_pdf_lines(file_content))
     except Exception as e:
         logger.error(f"Error parsing PDF: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to parse PDF: {str(e)}")
@@ -1669,10 +1936,7 @@ def parse_docx_syllabus(file_content: bytes) -> List[SyllabusTopic]:
     try:
         docx_file = io.BytesIO(file_content)
         doc = docx.Document(docx_file)
-        
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+        text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
         
         return parse_text_syllabus(text)
     except Exception as e:
@@ -1701,29 +1965,24 @@ def generate_quiz_questions(topics: List[str], num_questions: int = 20,
         logger.error(f"Error generating quiz: {e}")
         return generate_fallback_quiz(topics, num_questions, difficulty, question_types)
 
-def generate_quiz_with_gemini(topics: List[str], num_questions: int, 
-                            difficulty: str = "medium", question_types: List[str] = None) -> List[QuizQuestion]:
-    """Generate quiz using Gemini API with difficulty and type support"""
-    try:
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_api_key:
-            raise Exception("Gemini API key not found")
-        
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        topics_text = ", ".join(topics)
-        question_types_text = ", ".join(question_types) if question_types else "mcq, true_false"
-        
-        # Adjust prompt based on difficulty
-        difficulty_instruction = {
-            "easy": "Create straightforward questions that test basic understanding and recall.",
-            "medium": "Create questions that require some analysis and application of concepts.",
-            "hard": "Create challenging questions that require deep understanding, synthesis, and critical thinking."
-        }.get(difficulty, "Create questions that require some analysis and application of concepts.")
-        
-        prompt = f"""
-As an expert educator and content creator, generate {num_questions} {difficulty}-level quiz questions covering the following topics: {topics_text}
+# Instructions added to the quiz prompt for each difficulty level
+DIFFICULTY_INSTRUCTIONS = {
+    "easy": "Create straightforward questions that test basic understanding and recall.",
+    "medium": "Create questions that require some analysis and application of concepts.",
+    "hard": "Create challenging questions that require deep understanding, synthesis, and critical thinking."
+}
+
+@lru_cache(maxsize=16)
+def gemini_quiz_prompt_template(difficulty: str, question_types: tuple) -> Template:
+    """Specialize the Gemini quiz prompt for a difficulty and question types, leaving $num_questions and $topics_text open"""
+    question_types_text = ", ".join(question_types) if question_types else "mcq, true_false"
+    difficulty_instruction = DIFFICULTY_INSTRUCTIONS.get(difficulty, DIFFICULTY_INSTRUCTIONS["medium"])
+    
+    return Template(f"""
+As an expert educator and content creator, generate $num_questions {difficulty}-level quiz questions covering the following topics:
+$topics_text
+
+Distribute the questions evenly across the numbered topics and set each question's "topic" to the exact topic name from the list.
 
 Question types to include: {question_types_text}
 
@@ -1760,53 +2019,60 @@ Return ONLY a valid JSON array with the exact structure below. Include difficult
 ]
 
 Do not include any introductory or concluding remarks outside the JSON array.
-"""
-        
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Extract JSON from response
-        import re
-        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            questions_data = json.loads(json_str)
-            
-            questions = []
-            for q_data in questions_data:
-                if isinstance(q_data, dict) and 'question' in q_data and 'answer' in q_data:
-                    questions.append(QuizQuestion(
-                        question=q_data.get('question', ''),
-                        options=q_data.get('options', []),
-                        answer=q_data.get('answer', ''),
-                        explanation=q_data.get('explanation', ''),
-                        topic=q_data.get('topic', topics[0] if topics else 'General'),
-                        difficulty=q_data.get('difficulty', difficulty),
-                        type=q_data.get('type', 'mcq')
-                    ))
-            return questions
+""")
+
+@lru_cache(maxsize=64)
+def request_gemini_quiz(topics: tuple, num_questions: int, difficulty: str, question_types: tuple) -> tuple:
+    """Ask Gemini for questions on all topics in a single call, memoized per request shape"""
+    model = get_gemini_model('gemini-2.0-flash')
+    
+    # Number the topics so the model can spread questions over them in one batch
+    topics_text = "\n".join(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+    prompt = gemini_quiz_prompt_template(difficulty, question_types).safe_substitute(
+        num_questions=num_questions,
+        topics_text=topics_text
+    )
+    
+    response = model.generate_content(prompt)
+    response_text = response.text.strip()
+    
+    # Extract JSON from response; raise rather than return so failures are not memoized
+    json_str = extract_json_array(response_text)
+    if not json_str:
+        raise ValueError("No JSON array found in Gemini response")
+    return tuple(loads_json(json_str))
+
+def generate_quiz_with_gemini(topics: List[str], num_questions: int, 
+                            difficulty: str = "medium", question_types: List[str] = None) -> List[QuizQuestion]:
+    """Generate quiz using Gemini API with difficulty and type support"""
+    try:
+        questions_data = request_gemini_quiz(tuple(topics), num_questions, difficulty, tuple(question_types or ()))
         
-        return generate_fallback_quiz(topics, num_questions, difficulty, question_types)
+        questions = []
+        for q_data in questions_data:
+            if isinstance(q_data, dict) and 'question' in q_data and 'answer' in q_data:
+                questions.append(QuizQuestion(
+                    question=q_data.get('question', ''),
+                    options=q_data.get('options', []),
+                    answer=q_data.get('answer', ''),
+                    explanation=q_data.get('explanation', ''),
+                    topic=q_data.get('topic', topics[0] if topics else 'General'),
+                    difficulty=q_data.get('difficulty', difficulty),
+                    type=q_data.get('type', 'mcq')
+                ))
+        return questions
         
     except Exception as e:
         logger.error(f"Error generating quiz with Gemini: {e}")
         return generate_fallback_quiz(topics, num_questions, difficulty, question_types)
 
-def generate_quiz_with_openai(topics: List[str], num_questions: int, 
-                            difficulty: str = "medium", question_types: List[str] = None) -> List[QuizQuestion]:
-    """Generate quiz using OpenAI API with difficulty and type support"""
-    try:
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise Exception("OpenAI API key not found")
-        
-        client = openai.OpenAI(api_key=openai_api_key)
-        
-        topics_text = ", ".join(topics)
-        question_types_text = ", ".join(question_types) if question_types else "mcq, true_false"
-        
-        prompt = f"""
-Create {num_questions} {difficulty}-level quiz questions based on these topics: {topics_text}
+@lru_cache(maxsize=16)
+def openai_quiz_prompt_template(difficulty: str, question_types: tuple) -> Template:
+    """Specialize the OpenAI quiz prompt for a difficulty and question types, leaving $num_questions and $topics_text open"""
+    question_types_text = ", ".join(question_types) if question_types else "mcq, true_false"
+    
+    return Template(f"""
+Create $num_questions {difficulty}-level quiz questions based on these topics: $topics_text
 
 Question types to include: {question_types_text}
 
@@ -1833,12 +2099,23 @@ Return ONLY a valid JSON array with this exact structure:
 ]
 
 Distribute questions evenly across the topics. Make questions appropriate for {difficulty} level.
-"""
+""")
+
+def generate_quiz_with_openai(topics: List[str], num_questions: int, 
+                            difficulty: str = "medium", question_types: List[str] = None) -> List[QuizQuestion]:
+    """Generate quiz using OpenAI API with difficulty and type support"""
+    try:
+        client = get_openai_client()
+        
+        prompt = openai_quiz_prompt_template(difficulty, tuple(question_types or ())).safe_substitute(
+            num_questions=num_questions,
+            topics_text=", ".join(topics)
+        )
         
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": "You are a helpful assistant that creates educational quiz questions."},
+                QUIZ_SYSTEM_MESSAGE,
                 {"role": "user", "content": prompt}
             ],
             max_tokens=2000,
@@ -1848,11 +2125,9 @@ Distribute questions evenly across the topics. Make questions appropriate for {d
         response_text = response.choices[0].message.content.strip()
         
         # Extract JSON from response
-        import re
-        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            questions_data = json.loads(json_str)
+        json_str = extract_json_array(response_text)
+        if json_str:
+            questions_data = loads_json(json_str)
             
             questions = []
             for q_data in questions_data:
@@ -1874,31 +2149,50 @@ Distribute questions evenly across the topics. Make questions appropriate for {d
         logger.error(f"Error generating quiz with OpenAI: {e}")
         return generate_fallback_quiz(topics, num_questions, difficulty, question_types)
 
+# Question templates for variety in the fallback quiz, built once at import time.
+# MCQ entries carry the option summary used in their explanation; True/False
+# entries carry the lowercased verdict.
+FALLBACK_MCQ_TEMPLATES = [
+    (build_question, options, answer, ", ".join(options[:-1]))
+    for build_question, options, answer in [
+        (lambda topic: f"What is the primary purpose of {topic}?", ["Data analysis", "Problem solving", "Information processing", "All of the above"], "All of the above"),
+        (lambda topic: f"Which of the following best describes {topic}?", ["A simple concept", "A complex system", "A fundamental principle", "An optional feature"], "A fundamental principle"),
+        (lambda topic: f"{topic} is most commonly used for:", ["Basic operations", "Advanced applications", "Educational purposes", "Research and development"], "Advanced applications"),
+        (lambda topic: f"The main advantage of {topic} is:", ["Speed", "Accuracy", "Flexibility", "All of the above"], "All of the above"),
+        (lambda topic: f"{topic} typically involves:", ["Single step processes", "Multi-step procedures", "Random actions", "No specific method"], "Multi-step procedures")
+    ]
+]
+
+FALLBACK_TRUE_FALSE_TEMPLATES = [
+    (build_question, answer, answer.lower())
+    for build_question, answer in [
+        (lambda topic: f"{topic} is essential for modern computing systems.", "True"),
+        (lambda topic: f"{topic} can only be applied in specific scenarios.", "False"),
+        (lambda topic: f"Understanding {topic} requires advanced mathematical knowledge.", "False"),
+        (lambda topic: f"{topic} has evolved significantly over the years.", "True"),
+        (lambda topic: f"{topic} is only relevant for technical professionals.", "False"),
+        (lambda topic: f"{topic} provides a foundation for other related concepts.", "True"),
+        (lambda topic: f"{topic} is a static field that doesn't change.", "False"),
+        (lambda topic: f"{topic} can be learned through practical experience.", "True")
+    ]
+]
+
 def generate_fallback_quiz(topics: List[str], num_questions: int, 
                           difficulty: str = "medium", question_types: List[str] = None) -> List[QuizQuestion]:
     """Generate basic quiz questions as fallback with difficulty and type support"""
+    questions = build_fallback_quiz(
+        tuple(topics),
+        num_questions,
+        difficulty,
+        tuple(question_types or ("mcq", "true_false"))
+    )
+    # Hand out deep copies so callers never mutate the cached questions or their options
+    return [q.model_copy(deep=True) for q in questions]
+
+@lru_cache(maxsize=256)
+def build_fallback_quiz(topics: tuple, num_questions: int, difficulty: str, question_types: tuple) -> tuple:
+    """Build the fallback questions; the output depends only on the arguments, so it is memoized"""
     questions = []
-    question_types = question_types or ["mcq", "true_false"]
-    
-    # Question templates for variety
-    mcq_templates = [
-        ("What is the primary purpose of {topic}?", ["Data analysis", "Problem solving", "Information processing", "All of the above"], "All of the above"),
-        ("Which of the following best describes {topic}?", ["A simple concept", "A complex system", "A fundamental principle", "An optional feature"], "A fundamental principle"),
-        ("{topic} is most commonly used for:", ["Basic operations", "Advanced applications", "Educational purposes", "Research and development"], "Advanced applications"),
-        ("The main advantage of {topic} is:", ["Speed", "Accuracy", "Flexibility", "All of the above"], "All of the above"),
-        ("{topic} typically involves:", ["Single step processes", "Multi-step procedures", "Random actions", "No specific method"], "Multi-step procedures")
-    ]
-    
-    true_false_templates = [
-        ("{topic} is essential for modern computing systems.", "True"),
-        ("{topic} can only be applied in specific scenarios.", "False"),
-        ("Understanding {topic} requires advanced mathematical knowledge.", "False"),
-        ("{topic} has evolved significantly over the years.", "True"),
-        ("{topic} is only relevant for technical professionals.", "False"),
-        ("{topic} provides a foundation for other related concepts.", "True"),
-        ("{topic} is a static field that doesn't change.", "False"),
-        ("{topic} can be learned through practical experience.", "True")
-    ]
     
     # Generate questions ensuring good coverage
     questions_per_topic = max(1, num_questions // len(topics)) if topics else num_questions
@@ -1908,14 +2202,14 @@ def generate_fallback_quiz(topics: List[str], num_questions: int,
         
         # Add MCQ questions for this topic
         if "mcq" in question_types:
-            for j, (template, options, answer) in enumerate(mcq_templates):
+            for build_question, options, answer, aspects in FALLBACK_MCQ_TEMPLATES:
                 if topic_questions >= questions_per_topic:
                     break
                 questions.append(QuizQuestion(
-                    question=template.format(topic=topic),
+                    question=build_question(topic),
                     options=options,
                     answer=answer,
-                    explanation=f"{topic} is a comprehensive concept that encompasses multiple aspects including {', '.join(options[:-1])}.",
+                    explanation=f"{topic} is a comprehensive concept that encompasses multiple aspects including {aspects}.",
                     topic=topic,
                     difficulty=difficulty,
                     type="mcq"
@@ -1924,14 +2218,14 @@ def generate_fallback_quiz(topics: List[str], num_questions: int,
         
         # Add True/False questions for this topic
         if "true_false" in question_types:
-            for j, (template, answer) in enumerate(true_false_templates):
+            for build_question, answer, verdict in FALLBACK_TRUE_FALSE_TEMPLATES:
                 if topic_questions >= questions_per_topic:
                     break
                 questions.append(QuizQuestion(
-                    question=template.format(topic=topic),
+                    question=build_question(topic),
                     options=["True", "False"],
                     answer=answer,
-                    explanation=f"This statement about {topic} is {answer.lower()} because {topic} has specific characteristics and applications.",
+                    explanation=f"This statement about {topic} is {verdict} because {topic} has specific characteristics and applications.",
                     topic=topic,
                     difficulty=difficulty,
                     type="true_false"
@@ -1994,53 +2288,70 @@ def generate_fallback_quiz(topics: List[str], num_questions: int,
                     type="true_false"
                 ))
     
-    return questions[:num_questions]  # Ensure we don't exceed the requested number
+    return tuple(questions[:num_questions])  # Ensure we don't exceed the requested number
+
+def find_watched_topics(watched_videos: List[str], syllabus_topics: List[SyllabusTopic]) -> set:
+    """Return the syllabus topics whose name appears in any watched video URL"""
+    lowered_topics = [(topic.topic.lower(), topic.topic) for topic in syllabus_topics if topic.topic]
+    lowered_urls = [video_url.lower() for video_url in watched_videos]
+    watched_topics = set()
+    
+    if AHOCORASICK_AVAILABLE and lowered_topics:
+        # One automaton pass per URL instead of a substring search per topic
+        # Topics differing only in case share one key, so map each key to all originals
+        originals_by_key = {}
+        for lowered, original in lowered_topics:
+            originals_by_key.setdefault(lowered, []).append(original)
+        
+        automaton = ahocorasick.Automaton()
+        for lowered, originals in originals_by_key.items():
+            automaton.add_word(lowered, originals)
+        automaton.make_automaton()
+        
+        for lowered_url in lowered_urls:
+            for _, originals in automaton.iter(lowered_url):
+                watched_topics.update(originals)
+        return watched_topics
+    
+    for lowered_url in lowered_urls:
+        for lowered, original in lowered_topics:
+            if lowered in lowered_url:
+                watched_topics.add(original)
+    return watched_topics
 
 def generate_learning_report(quiz_attempts: List[QuizAttempt], watched_videos: List[str], syllabus_topics: List[SyllabusTopic]) -> ReportResponse:
     """Generate comprehensive learning report"""
     try:
+        # Tally attempts, correct answers and wrong selections per topic in one pass
+        topic_totals = Counter()
+        topic_correct = Counter()
+        mistake_groups = defaultdict(list)
+        for attempt in quiz_attempts:
+            topic_totals[attempt.topic] += 1
+            if attempt.is_correct:
+                topic_correct[attempt.topic] += 1
+            else:
+                mistake_groups[attempt.topic].append(attempt.selected_answer)
+        
         # Calculate overall score
         total_questions = len(quiz_attempts)
-        correct_answers = sum(1 for attempt in quiz_attempts if attempt.is_correct)
+        correct_answers = sum(topic_correct.values())
         overall_score = (correct_answers / total_questions * 100) if total_questions > 0 else 0
         
         # Calculate topic scores
-        topic_scores = {}
-        topic_attempts = {}
-        for attempt in quiz_attempts:
-            if attempt.topic not in topic_attempts:
-                topic_attempts[attempt.topic] = []
-            topic_attempts[attempt.topic].append(attempt)
-        
-        for topic, attempts in topic_attempts.items():
-            correct = sum(1 for a in attempts if a.is_correct)
-            topic_scores[topic] = (correct / len(attempts) * 100) if attempts else 0
+        topic_scores = {topic: topic_correct[topic] / count * 100 for topic, count in topic_totals.items()}
         
         # Identify weak areas (topics with score < 70%)
         weak_areas = [topic for topic, score in topic_scores.items() if score < 70]
         
         # Find common mistakes
-        mistakes = [attempt for attempt in quiz_attempts if not attempt.is_correct]
         common_mistakes = []
-        if mistakes:
-            # Group by topic and find most common wrong answers
-            mistake_groups = {}
-            for mistake in mistakes:
-                if mistake.topic not in mistake_groups:
-                    mistake_groups[mistake.topic] = []
-                mistake_groups[mistake.topic].append(mistake.selected_answer)
-            
-            for topic, wrong_answers in mistake_groups.items():
-                if len(wrong_answers) >= 2:  # At least 2 mistakes in same topic
-                    common_mistakes.append(f"Multiple mistakes in {topic}: {', '.join(set(wrong_answers))}")
+        for topic, wrong_answers in mistake_groups.items():
+            if len(wrong_answers) >= 2:  # At least 2 mistakes in same topic
+                common_mistakes.append(f"Multiple mistakes in {topic}: {', '.join(set(wrong_answers))}")
         
         # Find unwatched topics
-        watched_topics = set()
-        for video_url in watched_videos:
-            # Extract topic from video URL or title (simplified)
-            for topic in syllabus_topics:
-                if topic.topic.lower() in video_url.lower():
-                    watched_topics.add(topic.topic)
+        watched_topics = find_watched_topics(watched_videos, syllabus_topics)
         
         unwatched_topics = [topic.topic for topic in syllabus_topics if topic.topic not in watched_topics]
         
@@ -2055,6 +2366,15 @@ def generate_learning_report(quiz_attempts: List[QuizAttempt], watched_videos: L
         if not recommendations:
             recommendations.append("Great job! Keep up the good work.")
         
+        # Find the strongest and weakest topics in a single pass
+        strongest_topic = weakest_topic = "N/A"
+        best_score = worst_score = None
+        for topic, score in topic_scores.items():
+            if best_score is None or score > best_score:
+                strongest_topic, best_score = topic, score
+            if worst_score is None or score < worst_score:
+                weakest_topic, worst_score = topic, score
+        
         # Prepare report data
         report_data = {
             "quiz_summary": {
@@ -2065,10 +2385,10 @@ def generate_learning_report(quiz_attempts: List[QuizAttempt], watched_videos: L
             },
             "topic_breakdown": topic_scores,
             "performance_analysis": {
-                "strongest_topic": max(topic_scores.items(), key=lambda x: x[1])[0] if topic_scores else "N/A",
-                "weakest_topic": min(topic_scores.items(), key=lambda x: x[1])[0] if topic_scores else "N/A",
+                "strongest_topic": strongest_topic,
+                "weakest_topic": weakest_topic,
                 "topics_covered": len(topic_scores),
-                "topics_missed": len([t for t in syllabus_topics if t.topic not in topic_scores])
+                "topics_missed": sum(1 for t in syllabus_topics if t.topic not in topic_scores)
             },
             "study_recommendations": recommendations,
             "timestamp": datetime.now().isoformat()
@@ -2089,6 +2409,25 @@ def generate_learning_report(quiz_attempts: List[QuizAttempt], watched_videos: L
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
 # Syllabus endpoints
+# Syllabus uploads larger than this are rejected before parsing
+MAX_SYLLABUS_BYTES = int(os.getenv("MAX_SYLLABUS_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def read_upload_limited(file: UploadFile, max_bytes: int) -> bytes:
+    """Read an upload in chunks, rejecting it as soon as it exceeds max_bytes"""
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File is too large. Maximum size is {max_bytes // (1024 * 1024)}MB."
+            )
+    return bytes(buffer)
+
 @app.post("/upload_syllabus")
 async def upload_syllabus(
     file: Optional[UploadFile] = File(None),
@@ -2096,25 +2435,30 @@ async def upload_syllabus(
 ):
     """Upload and parse syllabus from file or text"""
     try:
-        topics = []
-        
         if file:
             # Parse uploaded file
-            file_content = await file.read()
+            file_content = await read_upload_limited(file, MAX_SYLLABUS_BYTES)
             file_extension = file.filename.lower().split('.')[-1] if file.filename else ''
             
             if file_extension == 'pdf':
-                topics = parse_pdf_syllabus(file_content)
+                parsed_topics = parse_pdf_syllabus(file_content)
             elif file_extension in ['docx', 'doc']:
-                topics = parse_docx_syllabus(file_content)
+                parsed_topics = parse_docx_syllabus(file_content)
             else:
                 raise HTTPException(status_code=400, detail="Unsupported file format. Use PDF or DOCX.")
         elif text_content:
-            # Parse text content
-            topics = parse_text_syllabus(text_content)
+            # Parse text content lazily; topics are consumed in the loop below
+            parsed_topics = iter_syllabus_topics(text_content.strip().split('\n'))
         else:
             raise HTTPException(status_code=400, detail="Either file or text_content must be provided.")
         
+        # Collect topics and their units in one pass
+        topics = []
+        units = {}
+        for topic in parsed_topics:
+            topics.append(topic)
+            units[topic.unit] = None
+        
         if not topics:
             raise HTTPException(status_code=400, detail="No topics found in the syllabus. Please check the format.")
         
@@ -2123,7 +2467,7 @@ async def upload_syllabus(
         return {
             "topics": topics,
             "total_topics": len(topics),
-            "units": list(set(topic.unit for topic in topics))
+            "units": list(units)
         }
         
     except HTTPException:
@@ -2132,43 +2476,50 @@ async def upload_syllabus(
         logger.error(f"Error uploading syllabus: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to upload syllabus: {str(e)}")
 
+# Upper bound on concurrent per-topic searches, to stay within YouTube API quota
+SYLLABUS_SEARCH_CONCURRENCY = 8
+
 @app.post("/videos_by_syllabus", response_model=SyllabusVideosResponse)
 async def get_videos_by_syllabus(request: SyllabusUploadRequest):
     """Get videos for each syllabus topic"""
     try:
-        syllabus_mapping = []
-        total_videos = 0
+        semaphore = asyncio.Semaphore(SYLLABUS_SEARCH_CONCURRENCY)
         
-        for topic in request.topics:
-            try:
-                # Search for videos using the topic name
-                search_keyword = f"{topic.topic} {topic.unit}"
-                videos = []
-                
+        async def find_topic_videos(topic: SyllabusTopic) -> Optional[SyllabusVideoMapping]:
+            # Search for videos using the topic name
+            search_keyword = f"{topic.topic} {topic.unit}"
+            
+            async with semaphore:
                 # Try YouTube API first
                 try:
-                    videos = search_videos_with_api(search_keyword)
-                    videos = videos[:5]  # Limit to top 5 videos
-                except:
+                    videos = await asyncio.to_thread(search_videos_with_api, search_keyword)
+                except Exception:
                     # Fallback to yt-dlp
                     try:
-                        videos = search_videos_with_ytdlp(search_keyword)
-                        videos = videos[:5]  # Limit to top 5 videos
-                    except:
+                        videos = await asyncio.to_thread(search_videos_with_ytdlp, search_keyword)
+                    except Exception:
                         logger.warning(f"Failed to find videos for topic: {topic.topic}")
-                        continue
-                
-                syllabus_mapping.append(SyllabusVideoMapping(
-                    topic=topic.topic,
-                    unit=topic.unit,
-                    videos=videos
-                ))
-                
-                total_videos += len(videos)
-                
-            except Exception as e:
-                logger.warning(f"Error processing topic {topic.topic}: {e}")
-                continue
+                        return None
+            
+            return SyllabusVideoMapping(
+                topic=topic.topic,
+                unit=topic.unit,
+                videos=videos[:5]  # Limit to top 5 videos
+            )
+        
+        results = await asyncio.gather(
+            *(find_topic_videos(topic) for topic in request.topics),
+            return_exceptions=True
+        )
+        
+        syllabus_mapping = []
+        for topic, result in zip(request.topics, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error processing topic {topic.topic}: {result}")
+            elif result is not None:
+                syllabus_mapping.append(result)
+        
+        total_videos = sum(len(mapping.videos) for mapping in syllabus_mapping)
         
         logger.info(f"Found {total_videos} videos for {len(syllabus_mapping)} topics")
         
@@ -2182,6 +2533,21 @@ async def get_videos_by_syllabus(request: SyllabusUploadRequest):
         logger.error(f"Error getting videos by syllabus: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get videos by syllabus: {str(e)}")
 
+def quiz_json_response(questions: List[dict], source: str, request: QuizRequest) -> Response:
+    """Serialize a QuizResponse-shaped payload in one call, skipping model re-validation"""
+    return Response(
+        content=dumps_json({
+            "questions": questions,
+            "total_questions": len(questions),
+            "topics_covered": list({q["topic"]: None for q in questions}),
+            "source": source,
+            "subject": request.subject,
+            "difficulty": request.difficulty,
+            "question_types": request.question_types
+        }),
+        media_type="application/json"
+    )
+
 @app.post("/generate_quiz", response_model=QuizResponse)
 async def generate_quiz(request: QuizRequest):
     """Generate quiz questions based on topics with offline support"""
@@ -2191,15 +2557,23 @@ async def generate_quiz(request: QuizRequest):
         
         # Try to generate quiz using AI
         try:
-            questions = generate_quiz_questions(request.topics, request.num_questions, request.difficulty, request.question_types)
+            questions = await asyncio.to_thread(
+                generate_quiz_questions, request.topics, request.num_questions, request.difficulty, request.question_types
+            )
             
             if questions:
+                # Bucket questions by topic once instead of rescanning them per topic
+                questions_by_topic = defaultdict(list)
+                for q in questions:
+                    questions_by_topic[q.topic].append(q)
+                
                 # Save quiz to local storage
                 try:
                     for topic in request.topics:
-                        topic_questions = [q for q in questions if q.topic == topic]
+                        topic_questions = questions_by_topic.get(topic)
                         if topic_questions:
-                            save_quiz_to_storage(
+                            await asyncio.to_thread(
+                                save_quiz_to_storage,
                                 request.subject, 
                                 "Unit 1",  # Default unit, can be enhanced
                                 topic, 
@@ -2211,7 +2585,7 @@ async def generate_quiz(request: QuizRequest):
                     logger.warning(f"Failed to save quiz to storage: {save_error}")
                 
                 # Get unique topics covered
-                topics_covered = list(set(q.topic for q in questions))
+                topics_covered = list(questions_by_topic)
                 
                 logger.info(f"Generated {len(questions)} quiz questions covering {len(topics_covered)} topics")
                 
@@ -2230,49 +2604,32 @@ async def generate_quiz(request: QuizRequest):
             
             # Try to load from offline storage
             offline_questions = []
+            offline_quizzes = await asyncio.to_thread(load_quizzes_bulk, request.subject, "Unit 1", request.topics)
             for topic in request.topics:
-                offline_quiz = load_quiz_from_storage(request.subject, "Unit 1", topic)
+                offline_quiz = offline_quizzes.get(topic)
                 if offline_quiz:
+                    # Stored questions were validated when saved, so keep them as plain dicts
                     for q_data in offline_quiz.get("questions", []):
-                        offline_questions.append(QuizQuestion(
-                            question=q_data["question"],
-                            options=q_data["options"],
-                            answer=q_data["answer"],
-                            explanation=q_data.get("explanation"),
-                            topic=q_data["topic"],
-                            difficulty=q_data.get("difficulty", "medium"),
-                            type=q_data.get("type", "mcq")
-                        ))
+                        offline_questions.append({
+                            "question": q_data["question"],
+                            "options": q_data["options"],
+                            "answer": q_data["answer"],
+                            "explanation": q_data.get("explanation"),
+                            "topic": q_data["topic"],
+                            "difficulty": q_data.get("difficulty", "medium"),
+                            "type": q_data.get("type", "mcq")
+                        })
             
             if offline_questions:
-                topics_covered = list(set(q.topic for q in offline_questions))
                 logger.info(f"Loaded {len(offline_questions)} questions from offline storage")
-                
-                return QuizResponse(
-                    questions=offline_questions,
-                    total_questions=len(offline_questions),
-                    topics_covered=topics_covered,
-                    source="offline",
-                    subject=request.subject,
-                    difficulty=request.difficulty,
-                    question_types=request.question_types
-                )
+                return quiz_json_response(offline_questions, "offline", request)
             
             # Fallback to basic questions
             fallback_questions = generate_fallback_quiz(request.topics, request.num_questions)
-            topics_covered = list(set(q.topic for q in fallback_questions))
             
             logger.info(f"Using fallback quiz with {len(fallback_questions)} questions")
             
-            return QuizResponse(
-                questions=fallback_questions,
-                total_questions=len(fallback_questions),
-                topics_covered=topics_covered,
-                source="fallback",
-                subject=request.subject,
-                difficulty=request.difficulty,
-                question_types=request.question_types
-            )
+            return quiz_json_response([q.model_dump() for q in fallback_questions], "fallback", request)
         
     except HTTPException:
         raise
@@ -2304,6 +2661,16 @@ async def generate_report(request: ReportRequest):
         logger.error(f"Error generating report: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
+# Directories already created by this process, so saves skip the mkdir syscalls
+known_storage_dirs = set()
+
+def ensure_storage_dir(path: Path):
+    """Create a storage directory once per process"""
+    key = str(path)
+    if key not in known_storage_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        known_storage_dirs.add(key)
+
 # Create storage directories
 def ensure_storage_directories():
     """Create necessary storage directories for offline functionality"""
@@ -2316,15 +2683,61 @@ def ensure_storage_directories():
     ]
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        ensure_storage_dir(Path(directory))
     
     # Initialize SQLite database for metadata
     init_storage_db()
 
+STORAGE_DB_PATH = "storage/storage.db"
+
+# One SQLite connection per thread, reused across requests
+db_connections = threading.local()
+
+def open_db_connection() -> sqlite3.Connection:
+    """Open a new tuned SQLite connection to the storage database"""
+    # Autocommit mode; writes take the lock up front via write_transaction()
+    conn = sqlite3.connect(STORAGE_DB_PATH, timeout=60, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA busy_timeout=60000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def get_db_connection() -> sqlite3.Connection:
+    """Get (or lazily open) this thread's tuned SQLite connection"""
+    conn = getattr(db_connections, "conn", None)
+    if conn is None:
+        conn = open_db_connection()
+        db_connections.conn = conn
+    return conn
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection):
+    """Run writes in a BEGIN IMMEDIATE transaction, rolling back on error"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
 def init_storage_db():
     """Initialize SQLite database for storage metadata"""
-    db_path = "storage/storage.db"
-    conn = sqlite3.connect(db_path)
+    # Runs at import, before the server processes fork, so it uses its own
+    # connection instead of caching one that the children would inherit
+    conn = open_db_connection()
+    try:
+        create_storage_schema(conn)
+    finally:
+        conn.close()
+
+def create_storage_schema(conn: sqlite3.Connection):
+    """Create or migrate the storage tables and indexes"""
     cursor = conn.cursor()
     
     # Create tables
@@ -2339,7 +2752,8 @@ def init_storage_db():
             question_count INTEGER,
             difficulty TEXT DEFAULT 'medium',
             question_types TEXT,
-            hash TEXT UNIQUE
+            hash TEXT UNIQUE,
+            document_created_at TEXT
         )
     ''')
     
@@ -2368,9 +2782,116 @@ def init_storage_db():
             topics_covered TEXT
         )
     ''')
-    
-    conn.commit()
-    conn.close()
+
+    # Normalized quiz questions, so offline replay and filters skip the JSON files
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quiz_questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quiz_id INTEGER NOT NULL REFERENCES quiz_metadata(id) ON DELETE CASCADE,
+            topic TEXT NOT NULL,
+            difficulty TEXT,
+            type TEXT,
+            question TEXT NOT NULL,
+            options_json TEXT,
+            answer TEXT,
+            explanation TEXT
+        )
+    ''')
+
+    # Composite indexes matching the lookup WHERE/ORDER BY shapes
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_quiz_lookup
+        ON quiz_metadata(subject, unit, topic, created_at DESC)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_quiz_subject
+        ON quiz_metadata(subject, created_at DESC)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_materials_lookup
+        ON study_materials(subject, topic, created_at DESC)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_qq_quiz
+        ON quiz_questions(quiz_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_qq_topic_diff
+        ON quiz_questions(topic, difficulty)
+    ''')
+
+    # Full-text index over question text, kept in sync by triggers
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS quiz_fts USING fts5(
+                question, explanation, content='quiz_questions', content_rowid='id'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS quiz_questions_ai AFTER INSERT ON quiz_questions BEGIN
+                INSERT INTO quiz_fts(rowid, question, explanation)
+                VALUES (new.id, new.question, new.explanation);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS quiz_questions_ad AFTER DELETE ON quiz_questions BEGIN
+                INSERT INTO quiz_fts(quiz_fts, rowid, question, explanation)
+                VALUES ('delete', old.id, old.question, old.explanation);
+            END
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"SQLite FTS5 not available, quiz search disabled: {e}")
+
+    # Schema version 1: question_types stored comma-joined instead of as JSON
+    with write_transaction(conn):
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 1:
+            cursor.execute('''
+                UPDATE quiz_metadata
+                SET question_types = REPLACE(REPLACE(REPLACE(REPLACE(
+                    question_types, '[', ''), ']', ''), '"', ''), ' ', '')
+                WHERE question_types LIKE '[%'
+            ''')
+            cursor.execute("PRAGMA user_version = 1")
+
+    # Schema version 2: keep each quiz document's own created_at, so quizzes
+    # rebuilt from quiz_questions rows match the stored file
+    with write_transaction(conn):
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 2:
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(quiz_metadata)")}
+            if "document_created_at" not in columns:
+                cursor.execute("ALTER TABLE quiz_metadata ADD COLUMN document_created_at TEXT")
+            cursor.execute("PRAGMA user_version = 2")
+
+    # Refresh planner statistics so the indexes get picked up
+    cursor.execute("ANALYZE")
+
+# Quiz files smaller than this are stored as plain JSON
+QUIZ_GZIP_MIN_BYTES = 1024
+
+def read_quiz_file(filepath: Path) -> bytes:
+    """Read a stored quiz file as JSON bytes, decompressing .gz files"""
+    data = filepath.read_bytes()
+    if filepath.suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+def write_bytes_atomic(filepath: Path, data: bytes):
+    """Write a file via a temp file and os.replace so readers never see a partial file"""
+    tmp_path = filepath.with_suffix(filepath.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+
+# Per-process sequence so two saves in the same nanosecond still get distinct names
+storage_counter = itertools.count()
+
+def storage_stamp() -> str:
+    """Sortable, collision-free stamp for storage filenames"""
+    return f"{time.time_ns():x}_{next(storage_counter):x}"
 
 def save_quiz_to_storage(subject: str, unit: str, topic: str, questions: List[QuizQuestion], 
                         difficulty: str = "medium", question_types: List[str] = None) -> str:
@@ -2378,14 +2899,12 @@ def save_quiz_to_storage(subject: str, unit: str, topic: str, questions: List[Qu
     try:
         # Create subject directory
         subject_dir = Path(f"storage/quizzes/{subject}")
-        subject_dir.mkdir(parents=True, exist_ok=True)
+        ensure_storage_dir(subject_dir)
         
         # Generate filename
-        safe_unit = re.sub(r'[^\w\s-]', '', unit).replace(' ', '_')
-        safe_topic = re.sub(r'[^\w\s-]', '', topic).replace(' ', '_')
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{safe_unit}_{safe_topic}_{timestamp}.json"
-        filepath = subject_dir / filename
+        safe_unit = SAFE_NAME_RE.sub('', unit).replace(' ', '_')
+        safe_topic = SAFE_NAME_RE.sub('', topic).replace(' ', '_')
+        filename = f"{safe_unit}_{safe_topic}_{storage_stamp()}.json"
         
         # Prepare quiz data
         quiz_data = {
@@ -2396,26 +2915,20 @@ def save_quiz_to_storage(subject: str, unit: str, topic: str, questions: List[Qu
             "difficulty": difficulty,
             "question_types": question_types or ["mcq", "true_false"],
             "question_count": len(questions),
-            "questions": [
-                {
-                    "question": q.question,
-                    "options": q.options,
-                    "answer": q.answer,
-                    "explanation": q.explanation,
-                    "topic": q.topic,
-                    "difficulty": getattr(q, 'difficulty', 'medium'),
-                    "type": getattr(q, 'type', 'mcq')
-                }
-                for q in questions
-            ]
+            "questions": [q.model_dump() for q in questions]
         }
         
-        # Save to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(quiz_data, f, indent=2, ensure_ascii=False)
+        # Save to file, gzipped unless the quiz is too small for it to pay off
+        raw = dumps_json(quiz_data)
+        if len(raw) >= QUIZ_GZIP_MIN_BYTES:
+            filename += ".gz"
+            raw = gzip.compress(raw, compresslevel=3)
+        filepath = subject_dir / filename
+        write_bytes_atomic(filepath, raw)
         
-        # Save metadata to database
-        save_quiz_metadata(subject, unit, topic, filename, len(questions), difficulty, question_types)
+        # Save metadata and question rows to database
+        save_quiz_records(subject, unit, topic, filename, difficulty, question_types,
+                          quiz_data["questions"], quiz_data["created_at"])
         
         return str(filepath)
         
@@ -2423,110 +2936,253 @@ def save_quiz_to_storage(subject: str, unit: str, topic: str, questions: List[Qu
         logger.error(f"Error saving quiz to storage: {e}")
         raise
 
-def save_quiz_metadata(subject: str, unit: str, topic: str, filename: str, 
-                      question_count: int, difficulty: str, question_types: List[str]):
-    """Save quiz metadata to SQLite database"""
-    try:
-        conn = sqlite3.connect("storage/storage.db")
-        cursor = conn.cursor()
-        
-        # Generate hash for uniqueness
-        content_hash = hashlib.md5(f"{subject}{unit}{topic}{filename}".encode()).hexdigest()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO quiz_metadata 
-            (subject, unit, topic, filename, question_count, difficulty, question_types, hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (subject, unit, topic, filename, question_count, difficulty, 
-              json.dumps(question_types) if question_types else None, content_hash))
-        
-        conn.commit()
-        conn.close()
-        
-    except Exception as e:
-        logger.error(f"Error saving quiz metadata: {e}")
+QUIZ_METADATA_INSERT_SQL = '''
+    INSERT OR REPLACE INTO quiz_metadata 
+    (subject, unit, topic, filename, question_count, difficulty, question_types, hash,
+     document_created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def quiz_content_hash(subject: str, unit: str, topic: str, filename: str) -> str:
+    """64-bit dedup key for a quiz metadata row (not a security hash)"""
+    # NUL separators keep "ab"+"c" and "a"+"bc" from colliding
+    key = f"{subject}\x00{unit}\x00{topic}\x00{filename}"
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(key)
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+QUIZ_QUESTION_INSERT_SQL = '''
+    INSERT INTO quiz_questions
+    (quiz_id, topic, difficulty, type, question, options_json, answer, explanation)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def quiz_metadata_row(subject: str, unit: str, topic: str, filename: str,
+                      question_count: int, difficulty: str, question_types: List[str],
+                      document_created_at: str) -> tuple:
+    """Build the quiz_metadata insert parameters"""
+    return (subject, unit, topic, filename, question_count, difficulty,
+            ",".join(question_types) if question_types else None,
+            quiz_content_hash(subject, unit, topic, filename), document_created_at)
+
+def save_quiz_records(subject: str, unit: str, topic: str, filename: str, difficulty: str,
+                      question_types: List[str], questions: List[dict], created_at: str):
+    """Save quiz metadata and its question rows in one transaction"""
+    conn = get_db_connection()
+    with write_transaction(conn):
+        cursor = conn.execute(QUIZ_METADATA_INSERT_SQL, quiz_metadata_row(
+            subject, unit, topic, filename, len(questions), difficulty, question_types, created_at
+        ))
+        quiz_id = cursor.lastrowid
+        conn.executemany(QUIZ_QUESTION_INSERT_SQL, [
+            (quiz_id, q["topic"], q["difficulty"], q["type"], q["question"],
+             json.dumps(q["options"]), q["answer"], q["explanation"])
+            for q in questions
+        ])
+
+QUIZ_SUMMARY_COLUMNS = (
+    "id, filename, created_at, question_count, difficulty, question_types, document_created_at"
+)
+
+def load_quiz_questions(conn: sqlite3.Connection, quiz_ids: List[int]) -> dict:
+    """Load normalized question rows for the given quizzes, keyed by quiz id"""
+    if not quiz_ids:
+        return {}
+    placeholders = ",".join("?" * len(quiz_ids))
+    rows = conn.execute(f'''
+        SELECT quiz_id, question, options_json, answer, explanation, topic, difficulty, type
+        FROM quiz_questions
+        WHERE quiz_id IN ({placeholders})
+        ORDER BY id
+    ''', quiz_ids).fetchall()
+    
+    questions = defaultdict(list)
+    for quiz_id, question, options_json, answer, explanation, topic, difficulty, q_type in rows:
+        questions[quiz_id].append({
+            "question": question,
+            "options": loads_json(options_json) if options_json else [],
+            "answer": answer,
+            "explanation": explanation,
+            "topic": topic,
+            "difficulty": difficulty or "medium",
+            "type": q_type or "mcq"
+        })
+    return questions
+
+def quiz_from_rows(subject: str, unit: str, topic: str, summary: tuple, questions: List[dict]) -> dict:
+    """Rebuild the stored quiz document from its metadata and question rows"""
+    _, _, _, question_count, difficulty, question_types, document_created_at = summary
+    return {
+        "subject": subject,
+        "unit": unit,
+        "topic": topic,
+        "created_at": document_created_at,
+        "difficulty": difficulty,
+        "question_types": question_types.split(",") if question_types else ["mcq", "true_false"],
+        "question_count": question_count,
+        "questions": questions
+    }
+
+# Stored quiz JSON keyed by quiz_metadata id. Ids are never reused, so entries
+# never go stale and saves from either server process need no invalidation.
+QUIZ_CACHE_SIZE = 256
+quiz_document_cache = OrderedDict()
+quiz_document_cache_lock = threading.Lock()
+
+def load_quiz_documents(conn: sqlite3.Connection, subject: str, unit: str, rows: List[tuple]) -> dict:
+    """Get JSON bytes for each (topic, *summary) row keyed by topic, using the cache when possible"""
+    documents = {}
+    missing = []
+    with quiz_document_cache_lock:
+        for topic, *summary in rows:
+            cached = quiz_document_cache.get(summary[0])
+            if cached is not None:
+                quiz_document_cache.move_to_end(summary[0])
+                documents[topic] = cached
+            else:
+                missing.append((topic, tuple(summary)))
+    
+    if not missing:
+        return documents
+    
+    questions = load_quiz_questions(conn, [summary[0] for _, summary in missing])
+    loaded = {}
+    legacy_rows = []
+    for topic, summary in missing:
+        # Rows saved without the document's created_at are served from their file
+        if questions.get(summary[0]) and summary[6] is not None:
+            quiz = quiz_from_rows(subject, unit, topic, summary, questions[summary[0]])
+            loaded[summary[0]] = (topic, dumps_json(quiz))
+        else:
+            legacy_rows.append((topic, summary))
+    
+    if legacy_rows:
+        def read_quiz(filename: str) -> Optional[bytes]:
+            try:
+                return read_quiz_file(Path(f"storage/quizzes/{subject}/{filename}"))
+            except OSError as e:
+                logger.warning(f"Could not read stored quiz {filename}: {e}")
+                return None
+        
+        # Quizzes saved before the questions table (or its created_at column) existed are read from disk
+        with ThreadPoolExecutor(max_workers=min(8, len(legacy_rows))) as pool:
+            legacy_quizzes = pool.map(read_quiz, [summary[1] for _, summary in legacy_rows])
+        
+        for (topic, summary), raw in zip(legacy_rows, legacy_quizzes):
+            if raw is not None:
+                loaded[summary[0]] = (topic, raw)
+    
+    with quiz_document_cache_lock:
+        for quiz_id, (topic, raw) in loaded.items():
+            documents[topic] = raw
+            quiz_document_cache[quiz_id] = raw
+        while len(quiz_document_cache) > QUIZ_CACHE_SIZE:
+            quiz_document_cache.popitem(last=False)
+    
+    return documents
 
 def load_quiz_from_storage(subject: str, unit: str, topic: str) -> Optional[dict]:
     """Load quiz from local storage"""
+    raw = load_quiz_bytes_from_storage(subject, unit, topic)
+    return loads_json(raw) if raw else None
+
+def load_quiz_bytes_from_storage(subject: str, unit: str, topic: str) -> Optional[bytes]:
+    """Load the JSON bytes of the latest stored quiz for a topic"""
     try:
         # Find the most recent quiz for this topic
-        conn = sqlite3.connect("storage/storage.db")
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT filename FROM quiz_metadata 
+        conn = get_db_connection()
+        summary = conn.execute(f'''
+            SELECT {QUIZ_SUMMARY_COLUMNS} FROM quiz_metadata 
             WHERE subject = ? AND unit = ? AND topic = ?
             ORDER BY created_at DESC LIMIT 1
-        ''', (subject, unit, topic))
+        ''', (subject, unit, topic)).fetchone()
         
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result:
+        if not summary:
             return None
         
-        filename = result[0]
-        filepath = Path(f"storage/quizzes/{subject}/{filename}")
-        
-        if not filepath.exists():
-            return None
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            quiz_data = json.load(f)
-        
-        return quiz_data
+        return load_quiz_documents(conn, subject, unit, [(topic, *summary)]).get(topic)
         
     except Exception as e:
         logger.error(f"Error loading quiz from storage: {e}")
         return None
 
+def load_quizzes_bulk(subject: str, unit: str, topics: List[str]) -> dict:
+    """Load the latest stored quiz for each topic with a single query"""
+    if not topics:
+        return {}
+    try:
+        conn = get_db_connection()
+        placeholders = ",".join("?" * len(topics))
+        rows = conn.execute(f'''
+            SELECT topic, {QUIZ_SUMMARY_COLUMNS} FROM (
+                SELECT topic, {QUIZ_SUMMARY_COLUMNS},
+                       ROW_NUMBER() OVER (PARTITION BY topic ORDER BY created_at DESC) AS rn
+                FROM quiz_metadata
+                WHERE subject = ? AND unit = ? AND topic IN ({placeholders})
+            ) WHERE rn = 1
+        ''', (subject, unit, *topics)).fetchall()
+        
+        if not rows:
+            return {}
+        
+        documents = load_quiz_documents(conn, subject, unit, rows)
+        return {topic: loads_json(raw) for topic, raw in documents.items()}
+        
+    except Exception as e:
+        logger.error(f"Error loading quizzes from storage: {e}")
+        return {}
+
 def get_available_quizzes(subject: str = None) -> List[dict]:
     """Get list of available quizzes from storage"""
     try:
-        conn = sqlite3.connect("storage/storage.db")
-        cursor = conn.cursor()
-        
-        if subject:
-            cursor.execute('''
-                SELECT subject, unit, topic, created_at, question_count, difficulty, question_types
-                FROM quiz_metadata 
-                WHERE subject = ?
-                ORDER BY created_at DESC
-            ''', (subject,))
-        else:
-            cursor.execute('''
-                SELECT subject, unit, topic, created_at, question_count, difficulty, question_types
-                FROM quiz_metadata 
-                ORDER BY created_at DESC
-            ''')
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        quizzes = []
-        for row in results:
-            quizzes.append({
-                "subject": row[0],
-                "unit": row[1], 
-                "topic": row[2],
-                "created_at": row[3],
-                "question_count": row[4],
-                "difficulty": row[5],
-                "question_types": json.loads(row[6]) if row[6] else []
-            })
-        
-        return quizzes
+        # Every save inserts a new row id, so the max id versions the listing
+        conn = get_db_connection()
+        version = conn.execute("SELECT MAX(id) FROM quiz_metadata").fetchone()[0]
+        return list(list_available_quizzes(subject, version))
         
     except Exception as e:
         logger.error(f"Error getting available quizzes: {e}")
         return []
 
+@lru_cache(maxsize=32)
+def list_available_quizzes(subject: Optional[str], version: Optional[int]) -> tuple:
+    """Query the quiz listing for one version of quiz_metadata"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    if subject:
+        cursor.execute('''
+            SELECT subject, unit, topic, created_at, question_count, difficulty, question_types
+            FROM quiz_metadata 
+            WHERE subject = ?
+            ORDER BY created_at DESC
+        ''', (subject,))
+    else:
+        cursor.execute('''
+            SELECT subject, unit, topic, created_at, question_count, difficulty, question_types
+            FROM quiz_metadata 
+            ORDER BY created_at DESC
+        ''')
+    
+    return tuple(
+        {
+            "subject": row["subject"],
+            "unit": row["unit"],
+            "topic": row["topic"],
+            "created_at": row["created_at"],
+            "question_count": row["question_count"],
+            "difficulty": row["difficulty"],
+            "question_types": row["question_types"].split(",") if row["question_types"] else []
+        }
+        for row in cursor
+    )
+
 # New endpoints for offline functionality
 @app.get("/available_quizzes")
 async def get_available_quizzes_endpoint(subject: str = None):
     """Get list of available quizzes from storage"""
     try:
-        quizzes = get_available_quizzes(subject)
+        quizzes = await asyncio.to_thread(get_available_quizzes, subject)
         return {
             "quizzes": quizzes,
             "total_count": len(quizzes)
@@ -2539,17 +3195,61 @@ async def get_available_quizzes_endpoint(subject: str = None):
 async def load_quiz_endpoint(subject: str, unit: str, topic: str):
     """Load a specific quiz from storage"""
     try:
-        quiz_data = load_quiz_from_storage(subject, unit, topic)
-        if not quiz_data:
+        # Pass the stored JSON straight through instead of parsing and re-serializing it
+        raw = await asyncio.to_thread(load_quiz_bytes_from_storage, subject, unit, topic)
+        if not raw:
             raise HTTPException(status_code=404, detail="Quiz not found in storage")
         
-        return quiz_data
+        return Response(content=raw, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error loading quiz: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to load quiz: {str(e)}")
 
+def save_study_material_metadata(subject: str, topic: str, material_type: str,
+                                 title: str, url: Optional[str], filename: Optional[str]):
+    """Insert a study material row into SQLite"""
+    conn = get_db_connection()
+    with write_transaction(conn):
+        conn.execute('''
+            INSERT INTO study_materials 
+            (subject, topic, material_type, title, url, filename, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (subject, topic, material_type, title, url, filename, json.dumps({})))
+
+def get_study_materials(subject: str, topic: str) -> List[dict]:
+    """Get study materials for a topic from SQLite"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT material_type, title, url, filename, created_at, metadata
+        FROM study_materials 
+        WHERE subject = ? AND topic = ?
+        ORDER BY created_at DESC
+    ''', (subject, topic))
+    
+    return [
+        {
+            "material_type": row["material_type"],
+            "title": row["title"],
+            "url": row["url"],
+            "filename": row["filename"],
+            "created_at": row["created_at"],
+            "metadata": loads_json(row["metadata"]) if row["metadata"] else {}
+        }
+        for row in cursor
+    ]
+
+def copy_upload_to_path(file: UploadFile, filepath: Path):
+    """Stream an uploaded file to disk in fixed-size chunks"""
+    file.file.seek(0)
+    tmp_path = filepath.with_suffix(filepath.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        shutil.copyfileobj(file.file, f, UPLOAD_CHUNK_SIZE)
+    os.replace(tmp_path, filepath)
+
 @app.post("/save_study_material")
 async def save_study_material(
     subject: str = Form(...),
@@ -2563,32 +3263,19 @@ async def save_study_material(
     try:
         # Create directory structure
         material_dir = Path(f"storage/materials/{subject}/{topic}")
-        material_dir.mkdir(parents=True, exist_ok=True)
+        ensure_storage_dir(material_dir)
         
         filename = None
         if file:
             # Save uploaded file
-            safe_filename = re.sub(r'[^\w\s-]', '', file.filename).replace(' ', '_')
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{safe_filename}"
+            safe_filename = SAFE_NAME_RE.sub('', file.filename).replace(' ', '_')
+            filename = f"{storage_stamp()}_{safe_filename}"
             filepath = material_dir / filename
             
-            with open(filepath, "wb") as f:
-                content = await file.read()
-                f.write(content)
+            await asyncio.to_thread(copy_upload_to_path, file, filepath)
         
         # Save metadata to database
-        conn = sqlite3.connect("storage/storage.db")
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO study_materials 
-            (subject, topic, material_type, title, url, filename, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (subject, topic, material_type, title, url, filename, json.dumps({})))
-        
-        conn.commit()
-        conn.close()
+        await asyncio.to_thread(save_study_material_metadata, subject, topic, material_type, title, url, filename)
         
         return {
             "message": "Study material saved successfully",
@@ -2606,29 +3293,7 @@ async def save_study_material(
 async def get_study_materials_endpoint(subject: str, topic: str):
     """Get study materials for a specific topic"""
     try:
-        conn = sqlite3.connect("storage/storage.db")
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT material_type, title, url, filename, created_at, metadata
-            FROM study_materials 
-            WHERE subject = ? AND topic = ?
-            ORDER BY created_at DESC
-        ''', (subject, topic))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        materials = []
-        for row in results:
-            materials.append({
-                "material_type": row[0],
-                "title": row[1],
-                "url": row[2],
-                "filename": row[3],
-                "created_at": row[4],
-                "metadata": json.loads(row[5]) if row[5] else {}
-            })
+        materials = await asyncio.to_thread(get_study_materials, subject, topic)
         
         return {
             "subject": subject,
@@ -2651,27 +3316,24 @@ def run_server(port: int):
     uvicorn.run(app, host="0.0.0.0", port=port)
 
 if __name__ == "__main__":
-    import threading
-    import time
-    
     print("🚀 Starting Stu-dih Backend Servers...")
     print("📖 API Documentation: http://localhost:8000/docs or http://localhost:8001/docs")
     print("🔗 Health Check: http://localhost:8000/health or http://localhost:8001/health")
     print("⏹️  Press Ctrl+C to stop")
     
-    # Start server on port 8000
-    server_8000 = threading.Thread(target=run_server, args=(8000,))
-    server_8000.daemon = True
-    server_8000.start()
-    
-    # Start server on port 8001
-    server_8001 = threading.Thread(target=run_server, args=(8001,))
-    server_8001.daemon = True
-    server_8001.start()
+    # Run each port in its own process so the servers don't share one GIL
+    servers = [
+        multiprocessing.Process(target=run_server, args=(port,), daemon=True)
+        for port in (8000, 8001)
+    ]
+    for server in servers:
+        server.start()
     
     try:
-        # Keep the main thread alive
-        while True:
-            time.sleep(1)
+        for server in servers:
+            server.join()
     except KeyboardInterrupt:
-        print("\n🛑 Shutting down servers...") 
\ No newline at end of file
+        print("\n🛑 Shutting down servers...")
+        for server in servers:
+            server.terminate()
+            server.join()
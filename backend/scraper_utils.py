@@ -0,0 +1,9 @@
+"""
+Scraper Utilities
+Shared settings for the BeautifulSoup-based study material scrapers
+"""
+
+from importlib.util import find_spec
+
+# lxml is a C parser and much faster than the pure-Python html.parser
+HTML_PARSER = "lxml" if find_spec("lxml") is not None else "html.parser"
@@ -2,14 +2,27 @@ import os
 import json
 import subprocess
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import List, Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 
+try:
+    from health_utils import health_timestamp
+except ImportError:
+    # Running from the project root
+    from backend.health_utils import health_timestamp
+
+try:
+    from json_utils import ORJSON_AVAILABLE
+except ImportError:
+    from backend.json_utils import ORJSON_AVAILABLE
+
 # Load environment variables
 load_dotenv()
 
@@ -17,7 +30,11 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="YouTube Video Search API", version="1.0.0")
+app = FastAPI(
+    title="YouTube Video Search API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -28,6 +45,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON bodies large enough to benefit
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
 # Pydantic models
 class VideoRequest(BaseModel):
     keyword: str
@@ -56,48 +76,51 @@ class VideoResponse(BaseModel):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": health_timestamp()}
+
+# The mock videos never change, so they are validated and dumped once at import
+MOCK_VIDEOS = [video.model_dump() for video in (
+    Video(
+        title="Sample YouTube Video",
+        video_url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        views=1000000,
+        likes=50000,
+        description="This is a sample video description for testing purposes.",
+        comment_count=1000,
+        top_comments=[
+            Comment(text="Great video!", author="User1", likes=10),
+            Comment(text="Amazing content!", author="User2", likes=5)
+        ],
+        thumbnail_url="https://img.youtube.com/vi/dQw4w9WgXcQ/hqdefault.jpg"
+    ),
+    Video(
+        title="Another Sample Video",
+        video_url="https://www.youtube.com/watch?v=9bZkp7q19f0",
+        views=2000000,
+        likes=75000,
+        description="Another sample video for testing the application.",
+        comment_count=1500,
+        top_comments=[
+            Comment(text="Awesome!", author="User3", likes=15),
+            Comment(text="Love this!", author="User4", likes=8)
+        ],
+        thumbnail_url="https://img.youtube.com/vi/9bZkp7q19f0/hqdefault.jpg"
+    )
+)]
+MOCK_RESPONSE_CLASS = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 
 @app.post("/get_videos", response_model=VideoResponse)
 async def get_videos(request: VideoRequest):
     """Get top 50 YouTube videos for a keyword"""
     try:
-        # For now, return mock data to test the frontend
-        mock_videos = [
-            Video(
-                title="Sample YouTube Video",
-                video_url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
-                views=1000000,
-                likes=50000,
-                description="This is a sample video description for testing purposes.",
-                comment_count=1000,
-                top_comments=[
-                    Comment(text="Great video!", author="User1", likes=10),
-                    Comment(text="Amazing content!", author="User2", likes=5)
-                ],
-                thumbnail_url="https://img.youtube.com/vi/dQw4w9WgXcQ/hqdefault.jpg"
-            ),
-            Video(
-                title="Another Sample Video",
-                video_url="https://www.youtube.com/watch?v=9bZkp7q19f0",
-                views=2000000,
-                likes=75000,
-                description="Another sample video for testing the application.",
-                comment_count=1500,
-                top_comments=[
-                    Comment(text="Awesome!", author="User3", likes=15),
-                    Comment(text="Love this!", author="User4", likes=8)
-                ],
-                thumbnail_url="https://img.youtube.com/vi/9bZkp7q19f0/hqdefault.jpg"
-            )
-        ]
-        
-        return VideoResponse(
-            videos=mock_videos,
-            total_count=len(mock_videos),
-            source="mock",
-            keyword=request.keyword
-        )
+        # For now, return mock data to test the frontend; returning a Response
+        # directly skips re-validating the static payload against VideoResponse
+        return MOCK_RESPONSE_CLASS({
+            "videos": MOCK_VIDEOS,
+            "total_count": len(MOCK_VIDEOS),
+            "source": "mock",
+            "keyword": request.keyword
+        })
         
     except Exception as e:
         logger.error(f"Error in get_videos: {e}")
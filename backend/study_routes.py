@@ -1,9 +1,11 @@
+import asyncio
 import os
 import json
 import logging
 import sqlite3
 from datetime import datetime
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 import requests
@@ -13,9 +15,15 @@ try:
 except ImportError:
     BEAUTIFULSOUP_AVAILABLE = False
     print("Warning: BeautifulSoup not available for web scraping.")
+import random
 import re
 from pathlib import Path
 
+try:
+    from json_utils import ORJSON_AVAILABLE, orjson
+except ImportError:
+    from backend.json_utils import ORJSON_AVAILABLE, orjson
+
 # Import existing AI libraries if available
 try:
     import google.generativeai as genai
@@ -175,73 +183,63 @@ else:
         }
     }
 
-@router.get("/subjects")
-async def get_subjects():
-    """Get available subjects for Diploma Computer Engineering 5th Sem"""
-    subjects = []
+def _subject_info(code: str, data: dict) -> dict:
+    """Subject listing entry, with the syllabus summary merged in when available"""
+    subject_info = {
+        "code": code,
+        "name": data["name"],
+        "description": data.get("description", ""),
+        "units": list(data["units"].keys()),
+        "total_topics": sum(len(topics) for topics in data["units"].values())
+    }
     
-    for code, data in DIPLOMA_SUBJECTS.items():
-        subject_info = {
-            "code": code,
-            "name": data["name"],
-            "description": data.get("description", ""),
-            "units": list(data["units"].keys()),
-            "total_topics": sum(len(topics) for topics in data["units"].values())
-        }
-        
-        # Add subject summary if available
-        if SYLLABUS_PARSER_AVAILABLE and get_subject_summary is not None:
-            summary = get_subject_summary(code)
-            subject_info.update(summary)
-        
-        subjects.append(subject_info)
+    # Add subject summary if available
+    if SYLLABUS_PARSER_AVAILABLE and get_subject_summary is not None:
+        subject_info.update(get_subject_summary(code))
     
-    return {"subjects": subjects}
+    return subject_info
 
-@router.get("/subjects/{subject_code}/units")
-async def get_subject_units(subject_code: str):
-    """Get units and topics for a specific subject"""
-    if subject_code not in DIPLOMA_SUBJECTS:
-        raise HTTPException(status_code=404, detail="Subject not found")
-    
-    subject_data = DIPLOMA_SUBJECTS[subject_code]
-    return {
-        "subject_code": subject_code,
-        "subject_name": subject_data["name"],
+# DIPLOMA_SUBJECTS is fixed once loaded, so the subject payloads are built at import
+SUBJECTS_PAYLOAD = {
+    "subjects": [_subject_info(code, data) for code, data in DIPLOMA_SUBJECTS.items()]
+}
+SUBJECT_UNITS_PAYLOADS = {
+    code: {
+        "subject_code": code,
+        "subject_name": data["name"],
         "units": [
             {
                 "unit": unit,
                 "topics": topics
             }
-            for unit, topics in subject_data["units"].items()
+            for unit, topics in data["units"].items()
         ]
     }
+    for code, data in DIPLOMA_SUBJECTS.items()
+}
+
+@router.get("/subjects")
+async def get_subjects():
+    """Get available subjects for Diploma Computer Engineering 5th Sem"""
+    return SUBJECTS_PAYLOAD
+
+@router.get("/subjects/{subject_code}/units")
+async def get_subject_units(subject_code: str):
+    """Get units and topics for a specific subject"""
+    units_payload = SUBJECT_UNITS_PAYLOADS.get(subject_code)
+    if units_payload is None:
+        raise HTTPException(status_code=404, detail="Subject not found")
+    return units_payload
 
 @router.post("/generate_study_material")
 async def generate_study_material(request: StudyMaterialRequest):
     """Generate study material for selected units"""
     try:
-        study_materials = {}
-        
-        for unit in request.units:
-            # Check cache first
-            cache_file = MATERIAL_CACHE_DIR / request.subject / f"{unit.replace(' ', '_')}.json"
-            
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    study_materials[unit] = json.load(f)
-                logger.info(f"Loaded cached study material for {unit}")
-                continue
-            
-            # Generate new study material
-            unit_materials = await _scrape_study_materials(request.subject, unit)
-            
-            # Cache the results
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(unit_materials, f, indent=2, ensure_ascii=False)
-            
-            study_materials[unit] = unit_materials
+        # Units are independent, so their cache lookups and scrapes run concurrently
+        unit_materials = await asyncio.gather(
+            *(_load_unit_study_materials(request.subject, unit) for unit in request.units)
+        )
+        study_materials = dict(zip(request.units, unit_materials))
         
         return {
             "subject": request.subject,
@@ -253,6 +251,48 @@ async def generate_study_material(request: StudyMaterialRequest):
         logger.error(f"Error generating study material: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate study material: {str(e)}")
 
+@lru_cache(maxsize=512)
+def _load_cache_file(path_str: str, mtime_ns: int, size: int) -> bytes:
+    """Raw contents of a cache file at a given modification time and size"""
+    with open(path_str, 'rb') as f:
+        return f.read()
+
+def _read_json_cache(cache_file: Path):
+    """Load a JSON cache file, or None when it does not exist"""
+    # The raw bytes are memoized per (path, mtime, size), so a rewrite by any
+    # process is picked up; misses are never cached. Each caller still gets
+    # its own freshly parsed copy
+    try:
+        stat = os.stat(cache_file)
+        raw = _load_cache_file(str(cache_file), stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+def _write_json_cache(cache_file: Path, data) -> None:
+    """Write a JSON cache file, creating its directory if needed"""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    if ORJSON_AVAILABLE:
+        # Same layout as the stdlib fallback: 2-space indent, UTF-8 text
+        cache_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+async def _load_unit_study_materials(subject: str, unit: str) -> Dict[str, List[Dict[str, str]]]:
+    """Study materials for one unit, from the cache or freshly scraped"""
+    # Check cache first; file I/O runs off the event loop
+    cache_file = MATERIAL_CACHE_DIR / subject / f"{unit.replace(' ', '_')}.json"
+    cached_materials = await asyncio.to_thread(_read_json_cache, cache_file)
+    if cached_materials is not None:
+        logger.info(f"Loaded cached study material for {unit}")
+        return cached_materials
+    
+    # Generate new study material and cache the results
+    unit_materials = await _scrape_study_materials(subject, unit)
+    await asyncio.to_thread(_write_json_cache, cache_file, unit_materials)
+    return unit_materials
+
 async def _scrape_study_materials(subject: str, unit: str) -> Dict[str, List[Dict[str, str]]]:
     """Scrape study materials from web sources"""
     materials = {
@@ -319,17 +359,15 @@ async def generate_quiz(request: QuizRequest):
             
             # Check cache first
             cache_file = QUIZZES_DIR / request.subject / f"{unit.replace(' ', '_')}.json"
+            cached_questions = await asyncio.to_thread(_read_json_cache, cache_file)
             
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cached_questions = json.load(f)
-                    # Randomly select from cached questions to ensure variety
-                    import random
-                    if len(cached_questions) >= unit_question_count:
-                        selected_questions = random.sample(cached_questions, unit_question_count)
-                    else:
-                        selected_questions = cached_questions
-                    quiz_questions.extend(selected_questions)
+            if cached_questions is not None:
+                # Randomly select from cached questions to ensure variety
+                if len(cached_questions) >= unit_question_count:
+                    selected_questions = random.sample(cached_questions, unit_question_count)
+                else:
+                    selected_questions = cached_questions
+                quiz_questions.extend(selected_questions)
                 logger.info(f"Loaded {len(selected_questions)} cached questions for {unit}")
                 continue
             
@@ -343,21 +381,15 @@ async def generate_quiz(request: QuizRequest):
             )
             
             # Cache the results
-            cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(unit_questions, f, indent=2, ensure_ascii=False)
+            await asyncio.to_thread(_write_json_cache, cache_file, unit_questions)
             
             quiz_questions.extend(unit_questions)
         
-        # Ensure uniqueness across all questions
-        unique_questions = []
-        seen_questions = set()
-        
+        # Ensure uniqueness across all questions, keeping the first occurrence in order
+        questions_by_key = {}
         for question in quiz_questions:
-            question_key = f"{question['question']}_{question['correct_answer']}"
-            if question_key not in seen_questions:
-                seen_questions.add(question_key)
-                unique_questions.append(question)
+            questions_by_key.setdefault((question['question'], question['correct_answer']), question)
+        unique_questions = list(questions_by_key.values())
         
         # If we don't have enough unique questions, add more from available pool
         if len(unique_questions) < total_requested:
@@ -383,8 +415,6 @@ async def generate_quiz(request: QuizRequest):
 
 async def _generate_quiz_questions(subject: str, unit: str, num_questions: int, difficulty: str, question_types: List[str]) -> List[Dict]:
     """Generate unique quiz questions using AI or fallback to predefined questions"""
-    questions = []
-    
     if AI_AVAILABLE:
         try:
             # Use AI to generate questions (implement with Gemini/OpenAI)
@@ -403,409 +433,419 @@ async def _generate_quiz_questions(subject: str, unit: str, num_questions: int,
         num_questions = len(fallback_questions)
     
     # Randomly select questions to ensure uniqueness and variety
-    import random
-    selected_questions = random.sample(fallback_questions, num_questions)
+    selected_indices = random.sample(range(len(fallback_questions)), num_questions)
     
-    for i, question_data in enumerate(selected_questions):
-        questions.append({
+    questions = [
+        {
             "id": i,
-            "question": question_data["question"],
-            "options": question_data["options"],
-            "correct_answer": question_data["correct_answer"],
-            "concept": question_data["concept"],
-            "question_type": question_data["type"],
+            "question": fallback_questions[index]["question"],
+            "options": fallback_questions[index]["options"],
+            "correct_answer": fallback_questions[index]["correct_answer"],
+            "concept": fallback_questions[index]["concept"],
+            "question_type": fallback_questions[index]["type"],
             "difficulty": difficulty
-        })
+        }
+        for i, index in enumerate(selected_indices)
+    ]
     
     logger.info(f"Generated {len(questions)} unique questions for {subject} - {unit}")
     return questions
 
-def _get_fallback_questions(subject: str, unit: str) -> List[Dict]:
-    """Get comprehensive fallback questions for when AI is not available"""
-    fallback_db = {
-        "315319-OPERATING SYSTEM": {
-            "Unit 1": [
-                {
-                    "question": "What is the primary function of an operating system?",
-                    "options": ["Run applications", "Manage hardware resources", "Connect to internet", "Create files"],
-                    "correct_answer": "Manage hardware resources",
-                    "concept": "OS Functions",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which of the following is NOT a type of operating system?",
-                    "options": ["Batch OS", "Time-sharing OS", "Real-time OS", "Web OS"],
-                    "correct_answer": "Web OS",
-                    "concept": "OS Types",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is a system call in operating systems?",
-                    "options": ["A function call", "A request to the kernel", "A hardware interrupt", "A user program"],
-                    "correct_answer": "A request to the kernel",
-                    "concept": "System Calls",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which component manages memory allocation in an OS?",
-                    "options": ["CPU Scheduler", "Memory Manager", "File Manager", "Device Manager"],
-                    "correct_answer": "Memory Manager",
-                    "concept": "OS Functions",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is the main purpose of a device driver?",
-                    "options": ["To run applications", "To manage hardware devices", "To create files", "To connect to network"],
-                    "correct_answer": "To manage hardware devices",
-                    "concept": "Device Management",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which OS type is designed for real-time applications?",
-                    "options": ["Batch OS", "Time-sharing OS", "Real-time OS", "Distributed OS"],
-                    "correct_answer": "Real-time OS",
-                    "concept": "OS Types",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is the kernel in an operating system?",
-                    "options": ["A user program", "The core component", "A device driver", "A file system"],
-                    "correct_answer": "The core component",
-                    "concept": "OS Architecture",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which OS function handles file operations?",
-                    "options": ["Process Management", "Memory Management", "File Management", "Device Management"],
-                    "correct_answer": "File Management",
-                    "concept": "OS Functions",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is multiprogramming in OS?",
-                    "options": ["Running multiple programs", "Multiple CPUs", "Multiple users", "Multiple files"],
-                    "correct_answer": "Running multiple programs",
-                    "concept": "OS Concepts",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which OS type allows multiple users to share resources?",
-                    "options": ["Batch OS", "Time-sharing OS", "Real-time OS", "Single-user OS"],
-                    "correct_answer": "Time-sharing OS",
-                    "concept": "OS Types",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 2": [
-                {
-                    "question": "What is a process in operating system?",
-                    "options": ["A program in execution", "A file on disk", "A memory location", "A CPU register"],
-                    "correct_answer": "A program in execution",
-                    "concept": "Process Management",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which scheduling algorithm provides the shortest average waiting time?",
-                    "options": ["FCFS", "SJF", "Round Robin", "Priority"],
-                    "correct_answer": "SJF",
-                    "concept": "Process Scheduling",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is the state of a process when it's waiting for I/O?",
-                    "options": ["Running", "Ready", "Blocked", "Terminated"],
-                    "correct_answer": "Blocked",
-                    "concept": "Process States",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is context switching?",
-                    "options": ["Changing programs", "Saving and loading process state", "Switching users", "Changing files"],
-                    "correct_answer": "Saving and loading process state",
-                    "concept": "Process Management",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which process state means the process is ready to execute?",
-                    "options": ["New", "Ready", "Running", "Blocked"],
-                    "correct_answer": "Ready",
-                    "concept": "Process States",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is a thread in operating systems?",
-                    "options": ["A lightweight process", "A file", "A memory location", "A device"],
-                    "correct_answer": "A lightweight process",
-                    "concept": "Threading",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which scheduling algorithm is preemptive?",
-                    "options": ["FCFS", "SJF", "Round Robin", "All of the above"],
-                    "correct_answer": "Round Robin",
-                    "concept": "Process Scheduling",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is interprocess communication?",
-                    "options": ["Processes talking to each other", "File sharing", "Memory sharing", "All of the above"],
-                    "correct_answer": "All of the above",
-                    "concept": "IPC",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is a deadlock?",
-                    "options": ["Process termination", "Resource sharing", "Processes waiting for each other", "Memory allocation"],
-                    "correct_answer": "Processes waiting for each other",
-                    "concept": "Deadlock",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which algorithm prevents deadlock?",
-                    "options": ["Banker's Algorithm", "FCFS", "SJF", "Round Robin"],
-                    "correct_answer": "Banker's Algorithm",
-                    "concept": "Deadlock Prevention",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 3": [
-                {
-                    "question": "What is virtual memory?",
-                    "options": ["Physical RAM", "Storage on hard disk", "Memory management technique", "Cache memory"],
-                    "correct_answer": "Memory management technique",
-                    "concept": "Virtual Memory",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which page replacement algorithm replaces the least recently used page?",
-                    "options": ["FIFO", "LRU", "Optimal", "Random"],
-                    "correct_answer": "LRU",
-                    "concept": "Page Replacement",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is paging in memory management?",
-                    "options": ["Dividing memory into fixed-size blocks", "Allocating memory", "Freeing memory", "Swapping memory"],
-                    "correct_answer": "Dividing memory into fixed-size blocks",
-                    "concept": "Paging",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is a page fault?",
-                    "options": ["Page corruption", "Page not in memory", "Page overflow", "Page deletion"],
-                    "correct_answer": "Page not in memory",
-                    "concept": "Page Faults",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which memory allocation technique suffers from external fragmentation?",
-                    "options": ["Paging", "Segmentation", "Fixed partitioning", "Dynamic partitioning"],
-                    "correct_answer": "Dynamic partitioning",
-                    "concept": "Memory Allocation",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 4": [
-                {
-                    "question": "What is a file system?",
-                    "options": ["A program", "A method for storing files", "A device", "A network"],
-                    "correct_answer": "A method for storing files",
-                    "concept": "File Systems",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which file system is used by Windows?",
-                    "options": ["ext4", "NTFS", "FAT32", "Both B and C"],
-                    "correct_answer": "Both B and C",
-                    "concept": "File Systems",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is a directory in file systems?",
-                    "options": ["A file", "A container for files", "A device", "A program"],
-                    "correct_answer": "A container for files",
-                    "concept": "File Organization",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 5": [
-                {
-                    "question": "What is device management in OS?",
-                    "options": ["Managing hardware devices", "Managing files", "Managing memory", "Managing processes"],
-                    "correct_answer": "Managing hardware devices",
-                    "concept": "Device Management",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which scheduling algorithm is used for disk I/O?",
-                    "options": ["FCFS", "SSTF", "SCAN", "All of the above"],
-                    "correct_answer": "All of the above",
-                    "concept": "Disk Scheduling",
-                    "type": "mcq"
-                }
-            ]
-        },
-        "315321-ADVANCE COMPUTER NETWORK": {
-            "Unit 1": [
-                {
-                    "question": "How many layers are there in the OSI model?",
-                    "options": ["5", "6", "7", "8"],
-                    "correct_answer": "7",
-                    "concept": "OSI Model",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which layer of OSI model handles routing?",
-                    "options": ["Data Link", "Network", "Transport", "Application"],
-                    "correct_answer": "Network",
-                    "concept": "OSI Model",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is the main protocol of the Internet?",
-                    "options": ["HTTP", "FTP", "TCP/IP", "SMTP"],
-                    "correct_answer": "TCP/IP",
-                    "concept": "TCP/IP Protocol",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which network topology is most reliable?",
-                    "options": ["Bus", "Star", "Ring", "Mesh"],
-                    "correct_answer": "Mesh",
-                    "concept": "Network Topologies",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is a LAN?",
-                    "options": ["Local Area Network", "Large Area Network", "Long Area Network", "Limited Area Network"],
-                    "correct_answer": "Local Area Network",
-                    "concept": "Network Types",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 2": [
-                {
-                    "question": "What is error detection in data link layer?",
-                    "options": ["Finding errors", "Correcting errors", "Preventing errors", "All of the above"],
-                    "correct_answer": "All of the above",
-                    "concept": "Error Detection",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which protocol provides reliable data transfer?",
-                    "options": ["UDP", "TCP", "IP", "ARP"],
-                    "correct_answer": "TCP",
-                    "concept": "Transport Layer",
-                    "type": "mcq"
-                }
-            ]
-        },
-        "315323-SOFTWARE ENGINEERING": {
-            "Unit 1": [
-                {
-                    "question": "What is the first phase of software development life cycle?",
-                    "options": ["Design", "Analysis", "Coding", "Testing"],
-                    "correct_answer": "Analysis",
-                    "concept": "Software Life Cycle",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which model is iterative and incremental?",
-                    "options": ["Waterfall", "Spiral", "Agile", "V-Model"],
-                    "correct_answer": "Spiral",
-                    "concept": "Software Process Models",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is requirements engineering?",
-                    "options": ["Coding", "Testing", "Gathering requirements", "Deployment"],
-                    "correct_answer": "Gathering requirements",
-                    "concept": "Requirements Engineering",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which diagram shows system processes?",
-                    "options": ["ER Diagram", "DFD", "Class Diagram", "Use Case Diagram"],
-                    "correct_answer": "DFD",
-                    "concept": "System Analysis",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is UML?",
-                    "options": ["Programming language", "Modeling language", "Database", "Operating system"],
-                    "correct_answer": "Modeling language",
-                    "concept": "UML Diagrams",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 2": [
-                {
-                    "question": "What is system analysis?",
-                    "options": ["Understanding system requirements", "Coding", "Testing", "Deployment"],
-                    "correct_answer": "Understanding system requirements",
-                    "concept": "System Analysis",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which diagram shows data relationships?",
-                    "options": ["DFD", "ER Diagram", "Class Diagram", "Use Case Diagram"],
-                    "correct_answer": "ER Diagram",
-                    "concept": "Entity Relationship Diagrams",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 3": [
-                {
-                    "question": "What is object-oriented analysis?",
-                    "options": ["Analyzing objects", "Analyzing classes", "Analyzing system using objects", "Analyzing data"],
-                    "correct_answer": "Analyzing system using objects",
-                    "concept": "Object-Oriented Analysis",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which UML diagram shows system actors?",
-                    "options": ["Class Diagram", "Use Case Diagram", "Sequence Diagram", "Activity Diagram"],
-                    "correct_answer": "Use Case Diagram",
-                    "concept": "UML Diagrams",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 4": [
-                {
-                    "question": "What is software testing?",
-                    "options": ["Finding bugs", "Fixing bugs", "Preventing bugs", "All of the above"],
-                    "correct_answer": "All of the above",
-                    "concept": "Software Testing",
-                    "type": "mcq"
-                },
-                {
-                    "question": "Which testing is done by developers?",
-                    "options": ["Unit Testing", "Integration Testing", "System Testing", "Acceptance Testing"],
-                    "correct_answer": "Unit Testing",
-                    "concept": "Testing Strategies",
-                    "type": "mcq"
-                }
-            ],
-            "Unit 5": [
-                {
-                    "question": "What is software maintenance?",
-                    "options": ["Fixing bugs", "Adding features", "Updating software", "All of the above"],
-                    "correct_answer": "All of the above",
-                    "concept": "Software Maintenance",
-                    "type": "mcq"
-                },
-                {
-                    "question": "What is software quality?",
-                    "options": ["Meeting requirements", "Being bug-free", "User satisfaction", "All of the above"],
-                    "correct_answer": "All of the above",
-                    "concept": "Software Quality",
-                    "type": "mcq"
-                }
-            ]
-        }
+# Predefined questions used when AI generation is unavailable
+_FALLBACK_DB = {
+    "315319-OPERATING SYSTEM": {
+        "Unit 1": [
+            {
+                "question": "What is the primary function of an operating system?",
+                "options": ["Run applications", "Manage hardware resources", "Connect to internet", "Create files"],
+                "correct_answer": "Manage hardware resources",
+                "concept": "OS Functions",
+                "type": "mcq"
+            },
+            {
+                "question": "Which of the following is NOT a type of operating system?",
+                "options": ["Batch OS", "Time-sharing OS", "Real-time OS", "Web OS"],
+                "correct_answer": "Web OS",
+                "concept": "OS Types",
+                "type": "mcq"
+            },
+            {
+                "question": "What is a system call in operating systems?",
+                "options": ["A function call", "A request to the kernel", "A hardware interrupt", "A user program"],
+                "correct_answer": "A request to the kernel",
+                "concept": "System Calls",
+                "type": "mcq"
+            },
+            {
+                "question": "Which component manages memory allocation in an OS?",
+                "options": ["CPU Scheduler", "Memory Manager", "File Manager", "Device Manager"],
+                "correct_answer": "Memory Manager",
+                "concept": "OS Functions",
+                "type": "mcq"
+            },
+            {
+                "question": "What is the main purpose of a device driver?",
+                "options": ["To run applications", "To manage hardware devices", "To create files", "To connect to network"],
+                "correct_answer": "To manage hardware devices",
+                "concept": "Device Management",
+                "type": "mcq"
+            },
+            {
+                "question": "Which OS type is designed for real-time applications?",
+                "options": ["Batch OS", "Time-sharing OS", "Real-time OS", "Distributed OS"],
+                "correct_answer": "Real-time OS",
+                "concept": "OS Types",
+                "type": "mcq"
+            },
+            {
+                "question": "What is the kernel in an operating system?",
+                "options": ["A user program", "The core component", "A device driver", "A file system"],
+                "correct_answer": "The core component",
+                "concept": "OS Architecture",
+                "type": "mcq"
+            },
+            {
+                "question": "Which OS function handles file operations?",
+                "options": ["Process Management", "Memory Management", "File Management", "Device Management"],
+                "correct_answer": "File Management",
+                "concept": "OS Functions",
+                "type": "mcq"
+            },
+            {
+                "question": "What is multiprogramming in OS?",
+                "options": ["Running multiple programs", "Multiple CPUs", "Multiple users", "Multiple files"],
+                "correct_answer": "Running multiple programs",
+                "concept": "OS Concepts",
+                "type": "mcq"
+            },
+            {
+                "question": "Which OS type allows multiple users to share resources?",
+                "options": ["Batch OS", "Time-sharing OS", "Real-time OS", "Single-user OS"],
+                "correct_answer": "Time-sharing OS",
+                "concept": "OS Types",
+                "type": "mcq"
+            }
+        ],
+        "Unit 2": [
+            {
+                "question": "What is a process in operating system?",
+                "options": ["A program in execution", "A file on disk", "A memory location", "A CPU register"],
+                "correct_answer": "A program in execution",
+                "concept": "Process Management",
+                "type": "mcq"
+            },
+            {
+                "question": "Which scheduling algorithm provides the shortest average waiting time?",
+                "options": ["FCFS", "SJF", "Round Robin", "Priority"],
+                "correct_answer": "SJF",
+                "concept": "Process Scheduling",
+                "type": "mcq"
+            },
+            {
+                "question": "What is the state of a process when it's waiting for I/O?",
+                "options": ["Running", "Ready", "Blocked", "Terminated"],
+                "correct_answer": "Blocked",
+                "concept": "Process States",
+                "type": "mcq"
+            },
+            {
+                "question": "What is context switching?",
+                "options": ["Changing programs", "Saving and loading process state", "Switching users", "Changing files"],
+                "correct_answer": "Saving and loading process state",
+                "concept": "Process Management",
+                "type": "mcq"
+            },
+            {
+                "question": "Which process state means the process is ready to execute?",
+                "options": ["New", "Ready", "Running", "Blocked"],
+                "correct_answer": "Ready",
+                "concept": "Process States",
+                "type": "mcq"
+            },
+            {
+                "question": "What is a thread in operating systems?",
+                "options": ["A lightweight process", "A file", "A memory location", "A device"],
+                "correct_answer": "A lightweight process",
+                "concept": "Threading",
+                "type": "mcq"
+            },
+            {
+                "question": "Which scheduling algorithm is preemptive?",
+                "options": ["FCFS", "SJF", "Round Robin", "All of the above"],
+                "correct_answer": "Round Robin",
+                "concept": "Process Scheduling",
+                "type": "mcq"
+            },
+            {
+                "question": "What is interprocess communication?",
+                "options": ["Processes talking to each other", "File sharing", "Memory sharing", "All of the above"],
+                "correct_answer": "All of the above",
+                "concept": "IPC",
+                "type": "mcq"
+            },
+            {
+                "question": "What is a deadlock?",
+                "options": ["Process termination", "Resource sharing", "Processes waiting for each other", "Memory allocation"],
+                "correct_answer": "Processes waiting for each other",
+                "concept": "Deadlock",
+                "type": "mcq"
+            },
+            {
+                "question": "Which algorithm prevents deadlock?",
+                "options": ["Banker's Algorithm", "FCFS", "SJF", "Round Robin"],
+                "correct_answer": "Banker's Algorithm",
+                "concept": "Deadlock Prevention",
+                "type": "mcq"
+            }
+        ],
+        "Unit 3": [
+            {
+                "question": "What is virtual memory?",
+                "options": ["Physical RAM", "Storage on hard disk", "Memory management technique", "Cache memory"],
+                "correct_answer": "Memory management technique",
+                "concept": "Virtual Memory",
+                "type": "mcq"
+            },
+            {
+                "question": "Which page replacement algorithm replaces the least recently used page?",
+                "options": ["FIFO", "LRU", "Optimal", "Random"],
+                "correct_answer": "LRU",
+                "concept": "Page Replacement",
+                "type": "mcq"
+            },
+            {
+                "question": "What is paging in memory management?",
+                "options": ["Dividing memory into fixed-size blocks", "Allocating memory", "Freeing memory", "Swapping memory"],
+                "correct_answer": "Dividing memory into fixed-size blocks",
+                "concept": "Paging",
+                "type": "mcq"
+            },
+            {
+                "question": "What is a page fault?",
+                "options": ["Page corruption", "Page not in memory", "Page overflow", "Page deletion"],
+                "correct_answer": "Page not in memory",
+                "concept": "Page Faults",
+                "type": "mcq"
+            },
+            {
+                "question": "Which memory allocation technique suffers from external fragmentation?",
+                "options": ["Paging", "Segmentation", "Fixed partitioning", "Dynamic partitioning"],
+                "correct_answer": "Dynamic partitioning",
+                "concept": "Memory Allocation",
+                "type": "mcq"
+            }
+        ],
+        "Unit 4": [
+            {
+                "question": "What is a file system?",
+                "options": ["A program", "A method for storing files", "A device", "A network"],
+                "correct_answer": "A method for storing files",
+                "concept": "File Systems",
+                "type": "mcq"
+            },
+            {
+                "question": "Which file system is used by Windows?",
+                "options": ["ext4", "NTFS", "FAT32", "Both B and C"],
+                "correct_answer": "Both B and C",
+                "concept": "File Systems",
+                "type": "mcq"
+            },
+            {
+                "question": "What is a directory in file systems?",
+                "options": ["A file", "A container for files", "A device", "A program"],
+                "correct_answer": "A container for files",
+                "concept": "File Organization",
+                "type": "mcq"
+            }
+        ],
+        "Unit 5": [
+            {
+                "question": "What is device management in OS?",
+                "options": ["Managing hardware devices", "Managing files", "Managing memory", "Managing processes"],
+                "correct_answer": "Managing hardware devices",
+                "concept": "Device Management",
+                "type": "mcq"
+            },
+            {
+                "question": "Which scheduling algorithm is used for disk I/O?",
+                "options": ["FCFS", "SSTF", "SCAN", "All of the above"],
+                "correct_answer": "All of the above",
+                "concept": "Disk Scheduling",
+                "type": "mcq"
+            }
+        ]
+    },
+    "315321-ADVANCE COMPUTER NETWORK": {
+        "Unit 1": [
+            {
+                "question": "How many layers are there in the OSI model?",
+                "options": ["5", "6", "7", "8"],
+                "correct_answer": "7",
+                "concept": "OSI Model",
+                "type": "mcq"
+            },
+            {
+                "question": "Which layer of OSI model handles routing?",
+                "options": ["Data Link", "Network", "Transport", "Application"],
+                "correct_answer": "Network",
+                "concept": "OSI Model",
+                "type": "mcq"
+            },
+            {
+                "question": "What is the main protocol of the Internet?",
+                "options": ["HTTP", "FTP", "TCP/IP", "SMTP"],
+                "correct_answer": "TCP/IP",
+                "concept": "TCP/IP Protocol",
+                "type": "mcq"
+            },
+            {
+                "question": "Which network topology is most reliable?",
+                "options": ["Bus", "Star", "Ring", "Mesh"],
+                "correct_answer": "Mesh",
+                "concept": "Network Topologies",
+                "type": "mcq"
+            },
+            {
+                "question": "What is a LAN?",
+                "options": ["Local Area Network", "Large Area Network", "Long Area Network", "Limited Area Network"],
+                "correct_answer": "Local Area Network",
+                "concept": "Network Types",
+                "type": "mcq"
+            }
+        ],
+        "Unit 2": [
+            {
+                "question": "What is error detection in data link layer?",
+                "options": ["Finding errors", "Correcting errors", "Preventing errors", "All of the above"],
+                "correct_answer": "All of the above",
+                "concept": "Error Detection",
+                "type": "mcq"
+            },
+            {
+                "question": "Which protocol provides reliable data transfer?",
+                "options": ["UDP", "TCP", "IP", "ARP"],
+                "correct_answer": "TCP",
+                "concept": "Transport Layer",
+                "type": "mcq"
+            }
+        ]
+    },
+    "315323-SOFTWARE ENGINEERING": {
+        "Unit 1": [
+            {
+                "question": "What is the first phase of software development life cycle?",
+                "options": ["Design", "Analysis", "Coding", "Testing"],
+                "correct_answer": "Analysis",
+                "concept": "Software Life Cycle",
+                "type": "mcq"
+            },
+            {
+                "question": "Which model is iterative and incremental?",
+                "options": ["Waterfall", "Spiral", "Agile", "V-Model"],
+                "correct_answer": "Spiral",
+                "concept": "Software Process Models",
+                "type": "mcq"
+            },
+            {
+                "question": "What is requirements engineering?",
+                "options": ["Coding", "Testing", "Gathering requirements", "Deployment"],
+                "correct_answer": "Gathering requirements",
+                "concept": "Requirements Engineering",
+                "type": "mcq"
+            },
+            {
+                "question": "Which diagram shows system processes?",
+                "options": ["ER Diagram", "DFD", "Class Diagram", "Use Case Diagram"],
+                "correct_answer": "DFD",
+                "concept": "System Analysis",
+                "type": "mcq"
+            },
+            {
+                "question": "What is UML?",
+                "options": ["Programming language", "Modeling language", "Database", "Operating system"],
+                "correct_answer": "Modeling language",
+                "concept": "UML Diagrams",
+                "type": "mcq"
+            }
+        ],
+        "Unit 2": [
+            {
+                "question": "What is system analysis?",
+                "options": ["Understanding system requirements", "Coding", "Testing", "Deployment"],
+                "correct_answer": "Understanding system requirements",
+                "concept": "System Analysis",
+                "type": "mcq"
+            },
+            {
+                "question": "Which diagram shows data relationships?",
+                "options": ["DFD", "ER Diagram", "Class Diagram", "Use Case Diagram"],
+                "correct_answer": "ER Diagram",
+                "concept": "Entity Relationship Diagrams",
+                "type": "mcq"
+            }
+        ],
+        "Unit 3": [
+            {
+                "question": "What is object-oriented analysis?",
+                "options": ["Analyzing objects", "Analyzing classes", "Analyzing system using objects", "Analyzing data"],
+                "correct_answer": "Analyzing system using objects",
+                "concept": "Object-Oriented Analysis",
+                "type": "mcq"
+            },
+            {
+                "question": "Which UML diagram shows system actors?",
+                "options": ["Class Diagram", "Use Case Diagram", "Sequence Diagram", "Activity Diagram"],
+                "correct_answer": "Use Case Diagram",
+                "concept": "UML Diagrams",
+                "type": "mcq"
+            }
+        ],
+        "Unit 4": [
+            {
+                "question": "What is software testing?",
+                "options": ["Finding bugs", "Fixing bugs", "Preventing bugs", "All of the above"],
+                "correct_answer": "All of the above",
+                "concept": "Software Testing",
+                "type": "mcq"
+            },
+            {
+                "question": "Which testing is done by developers?",
+                "options": ["Unit Testing", "Integration Testing", "System Testing", "Acceptance Testing"],
+                "correct_answer": "Unit Testing",
+                "concept": "Testing Strategies",
+                "type": "mcq"
+            }
+        ],
+        "Unit 5": [
+            {
+                "question": "What is software maintenance?",
+                "options": ["Fixing bugs", "Adding features", "Updating software", "All of the above"],
+                "correct_answer": "All of the above",
+                "concept": "Software Maintenance",
+                "type": "mcq"
+            },
+            {
+                "question": "What is software quality?",
+                "options": ["Meeting requirements", "Being bug-free", "User satisfaction", "All of the above"],
+                "correct_answer": "All of the above",
+                "concept": "Software Quality",
+                "type": "mcq"
+            }
+        ]
     }
-    
-    return fallback_db.get(subject, {}).get(unit, [])
+}
+
+# Per-unit question pools as tuples, built once at import for index-based sampling.
+# The question dicts (and their options lists) are shared with every response
+# and cache write, so they must not be mutated
+FALLBACK_QUESTIONS = {
+    subject: {unit: tuple(questions) for unit, questions in units.items()}
+    for subject, units in _FALLBACK_DB.items()
+}
+
+def _get_fallback_questions(subject: str, unit: str) -> Tuple[Dict, ...]:
+    """Get comprehensive fallback questions for when AI is not available"""
+    return FALLBACK_QUESTIONS.get(subject, {}).get(unit, ())
 
 @router.post("/evaluate_quiz")
 async def evaluate_quiz(submission: QuizSubmission):
@@ -814,12 +854,10 @@ async def evaluate_quiz(submission: QuizSubmission):
         # Load the original quiz
         quiz_file = QUIZZES_DIR / submission.subject / f"{submission.unit.replace(' ', '_')}.json"
         
-        if not quiz_file.exists():
+        quiz_questions = await asyncio.to_thread(_read_json_cache, quiz_file)
+        if quiz_questions is None:
             raise HTTPException(status_code=404, detail="Quiz not found")
         
-        with open(quiz_file, 'r', encoding='utf-8') as f:
-            quiz_questions = json.load(f)
-        
         # Evaluate responses
         mistakes = []
         correct_count = 0
@@ -860,10 +898,9 @@ async def _get_study_resources_for_concept(subject: str, concept: str) -> List[D
     """Get study resources for a specific concept"""
     # Check cache first
     cache_file = MATERIAL_CACHE_DIR / subject / f"{concept.replace(' ', '_')}_resources.json"
-    
-    if cache_file.exists():
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    cached_resources = await asyncio.to_thread(_read_json_cache, cache_file)
+    if cached_resources is not None:
+        return cached_resources
     
     # Generate new resources
     resources = [
@@ -888,9 +925,7 @@ async def _get_study_resources_for_concept(subject: str, concept: str) -> List[D
     ]
     
     # Cache the resources
-    cache_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(cache_file, 'w', encoding='utf-8') as f:
-        json.dump(resources, f, indent=2, ensure_ascii=False)
+    await asyncio.to_thread(_write_json_cache, cache_file, resources)
     
     return resources
 
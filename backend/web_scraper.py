@@ -16,6 +16,12 @@ import os
 import json
 from dotenv import load_dotenv
 
+# HTML parser shared by the scrapers (lxml when installed)
+try:
+    from scraper_utils import HTML_PARSER
+except ImportError:
+    from backend.scraper_utils import HTML_PARSER
+
 # Import AI configuration
 try:
     from ai_config import AIConfig
@@ -184,7 +190,7 @@ class StudyMaterialScraper:
                 try:
                     response = self.session.get(site, timeout=10)
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        soup = BeautifulSoup(response.content, HTML_PARSER)
                         articles.extend(self._extract_articles_from_site(soup, site, query))
                 except Exception as e:
                     logger.warning(f"Error scraping {site}: {e}")
@@ -211,7 +217,7 @@ class StudyMaterialScraper:
                 try:
                     response = self.session.get(site, timeout=10)
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        soup = BeautifulSoup(response.content, HTML_PARSER)
                         videos.extend(self._extract_videos_from_site(soup, site, query))
                 except Exception as e:
                     logger.warning(f"Error scraping videos from {site}: {e}")
@@ -238,7 +244,7 @@ class StudyMaterialScraper:
                 try:
                     response = self.session.get(site, timeout=10)
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        soup = BeautifulSoup(response.content, HTML_PARSER)
                         notes.extend(self._extract_notes_from_site(soup, site, query))
                 except Exception as e:
                     logger.warning(f"Error scraping notes from {site}: {e}")